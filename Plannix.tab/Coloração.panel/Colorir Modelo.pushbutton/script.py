@@ -3,7 +3,7 @@
 # HEADER
 __title__ = "Colorir Modelo"
 __author__ = "Daniel Viegas"
-__doc__ = """Aplica, remove cores e oculta/reexibe categorias nos elementos do modelo na vista ativa de acordo com o status da peça."""
+__doc__ = """Aplica, remove cores e oculta/reexibe categorias nos elementos do modelo na vista ativa, ou em um lote de vistas, de acordo com o status da peça."""
 
 # IMPORTS
 import os
@@ -14,6 +14,18 @@ clr.AddReference("System")
 from System.Collections.Generic import List
 from Autodesk.Revit.DB import *
 from pyrevit import forms, script
+from Snippets._assemblies import AssemblyIndex
+from Snippets._colors import (
+    MODO_REVISOES,
+    MODO_STATUS,
+    ColorSnapshot,
+    apply_colors_generic,
+    clear_snapshot_overrides,
+    remove_colors as remove_colors_view,
+)
+from Snippets._params import ParametroAusenteError
+from Snippets._viewfilters import apply_filter_colors
+from Snippets._views import all_3d_views, split_filter_views, views_matching, views_on_sheets
 
 # HARD VARIABLES
 doc         = __revit__.ActiveUIDocument.Document
@@ -23,119 +35,17 @@ output      = script.get_output()
 PATH_SCRIPT = os.path.dirname(__file__)
 xaml_path   = os.path.join(PATH_SCRIPT, "colorir.xaml")
 
-# PARAM
-PARAM_EXPORTADO = "20. EXPORTADO?"
-PARAM_REVISOES  = "21. NÚMERO DE REVISÕES"
-
 # CONFIG (persistência de estado)
 config = script.get_config("PlannixColorir")
 
-# SOFT VARIABLES
-STATUSPECA = "18. STATUS DA PEÇA"
-
-statuspj = "Projetada"
-statuspg = "Programada"
-statuscd = "Corte e Dobra Realizado"
-statusar = "Armação Realizada"
-statusfo = "Forma Realizada"
-statusfa = "Forma com Armação Realizada"
-statusco = "Concretagem Realizada"
-statuspr = "Preparação Realizada"
-statusct = "Corte Realizado"
-statuspm = "Pré-montagem Realizada"
-statusmm = "Montagem Realizada (Met.)"
-statussd = "Solda Realizada"
-statusam = "Acabamento Realizado (Met.)"
-statusjt = "Jateamento Realizado"
-statusgv = "Galvanização Realizada"
-statuspt = "Pintura Realizada"
-statusac = "Acabamento Realizado"
-statusex = "Expedida para a Obra"
-statusdv = "Devolvida pela Obra"
-statusdc = "Descarregada na Obra"
-statusmt = "Montada na Obra"
-
-cordf = Color(192, 192, 192)
-corpj = Color(178, 102, 255)
-corpg = Color(255, 102, 178)
-corcd = Color(255, 185, 185)
-corar = Color(255, 145, 145)
-corfo = Color(255, 105, 105)
-corfa = Color(255,  65,  65)
-corco = Color(255,   5,   5)
-corpr = Color(255, 205, 205)
-corct = Color(255, 180, 180)
-corpm = Color(255, 155, 155)
-cormm = Color(255, 130, 130)
-corsd = Color(255, 105, 105)
-coram = Color(255,  80,  80)
-corjt = Color(255,  55,  55)
-corgv = Color(255,  30,  30)
-corpt = Color(255,   5,   5)
-corac = Color(255, 178, 102)
-corex = Color(255, 128,   0)
-cordv = Color(102,   0,   0)
-cordc = Color(255, 255, 102)
-cormt = Color(102, 255, 102)
-
-# CORES DE REVISÃO
-notexp = Color(192, 192, 192)
-rev0   = Color(  0, 191, 255)
-rev1   = Color(  0, 250, 154)
-rev2   = Color(238, 238,   0)
-rev3   = Color(249, 178,   8)
-rev4   = Color(238,  44,  44)
-rev5   = Color(180,   0,   0)
-
-# STATUS → COR
-status_color_map = {
-    statuspj: corpj,
-    statuspg: corpg,
-    statuscd: corcd,
-    statusar: corar,
-    statusfo: corfo,
-    statusfa: corfa,
-    statusco: corco,
-    statuspr: corpr,
-    statusct: corct,
-    statuspm: corpm,
-    statusmm: cormm,
-    statussd: corsd,
-    statusam: coram,
-    statusjt: corjt,
-    statusgv: corgv,
-    statuspt: corpt,
-    statusac: corac,
-    statusex: corex,
-    statusdv: cordv,
-    statusdc: cordc,
-    statusmt: cormt,
-}
-
-# CATEGORIAS DE INTERESSE
-categorias_interesse = [
-    BuiltInCategory.OST_StructuralColumns,
-    BuiltInCategory.OST_StructuralFraming,
-    BuiltInCategory.OST_StructuralFoundation,
-    BuiltInCategory.OST_Floors,
-    BuiltInCategory.OST_Walls,
-    BuiltInCategory.OST_Assemblies,
-]
-categorias_ids = set(int(c) for c in categorias_interesse)
-
-categorias_principais_ids = set([
-    int(BuiltInCategory.OST_StructuralColumns),
-    int(BuiltInCategory.OST_StructuralFraming),
-    int(BuiltInCategory.OST_StructuralFoundation),
-    int(BuiltInCategory.OST_Walls),
-    int(BuiltInCategory.OST_Floors),
-])
+# SNAPSHOT (cores já aplicadas em cada vista deste documento)
+snapshot = ColorSnapshot(script.get_document_data_file("colorir_snapshot", "json"))
 
 # XAML
 default_xaml = """
 <Window xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation"
         Title="Colorir Modelo"
-        Height="240"
+        Height="355"
         Width="400"
         WindowStartupLocation="CenterScreen"
         ResizeMode="NoResize">
@@ -158,7 +68,22 @@ default_xaml = """
 
         <RadioButton Name="radio_remover"
                      Content="Remover cores dos elementos"
-                     Margin="0,0,0,15"/>
+                     Margin="0,0,0,10"/>
+
+        <CheckBox Name="check_filtros"
+                  Content="Colorir por filtros de vista (modelos grandes)"
+                  Margin="0,0,0,12"/>
+
+        <TextBlock Text="Vistas:" Margin="0,0,0,4"/>
+
+        <ComboBox Name="combo_vistas" Margin="0,0,0,6">
+            <ComboBoxItem Content="Vista ativa" IsSelected="True"/>
+            <ComboBoxItem Content="Todas as vistas 3D"/>
+            <ComboBoxItem Content="Vistas das folhas escolhidas"/>
+            <ComboBoxItem Content="Vistas com nome contendo o padrão"/>
+        </ComboBox>
+
+        <TextBox Name="text_padrao" Margin="0,0,0,15"/>
 
         <StackPanel Orientation="Horizontal"
                     HorizontalAlignment="Right">
@@ -181,146 +106,75 @@ default_xaml = """
 
 # FUNCTIONS
 
-def get_solid_fill_id():
-    patterns = FilteredElementCollector(doc).OfClass(FillPatternElement).ToElements()
-    for fp in patterns:
-        if fp.GetFillPattern().IsSolidFill:
-            return fp.Id
-    return ElementId.InvalidElementId
-
-
-def get_status(element):
-    if element is None:
-        return ""
-    param = element.LookupParameter(STATUSPECA)
-    if not param:
-        return ""
-    value = param.AsValueString() or param.AsString() or ""
-    return value.strip()
-
-
-def get_color_for_status(status_value):
-    if not status_value:
-        return cordf
-    status_lower = status_value.strip().lower()
-    for key, color in status_color_map.items():
-        if key.lower() == status_lower:
-            return color
-    return cordf
-
-
-def get_color_for_revisoes(element):
-    if element is None:
-        return notexp
-    param_exp = element.LookupParameter(PARAM_EXPORTADO)
-    param_rev = element.LookupParameter(PARAM_REVISOES)
-    exportado = param_exp.AsInteger() == 1 if param_exp else False
-    if not exportado:
-        return notexp
-    try:
-        revisoes = param_rev.AsInteger() if param_rev else 0
-    except:
-        revisoes = 0
-    if revisoes <= 0:
-        return rev0
-    elif revisoes == 1:
-        return rev1
-    elif revisoes == 2:
-        return rev2
-    elif revisoes == 3:
-        return rev3
-    elif revisoes == 4:
-        return rev4
-    else:
-        return rev5
-
-
-def make_override(color, solid_fill_id):
-    ogs = OverrideGraphicSettings()
-    ogs.SetSurfaceForegroundPatternColor(color)
-    if solid_fill_id != ElementId.InvalidElementId:
-        ogs.SetSurfaceForegroundPatternId(solid_fill_id)
-    ogs.SetSurfaceTransparency(0)
-    return ogs
-
-
-def get_main_element(assembly):
-    for mid in assembly.GetMemberIds():
-        membro = doc.GetElement(mid)
-        if not membro or not membro.Category:
-            continue
-        if membro.Category.Id.IntegerValue in categorias_principais_ids:
-            return membro
-    return None
-
-
-def apply_colors_generic(get_color_func, transaction_name, msg):
-    solid_fill_id = get_solid_fill_id()
-    count = 0
-    with Transaction(doc, transaction_name) as t:
-        t.Start()
-        for cat in categorias_interesse:
-            if cat == BuiltInCategory.OST_Assemblies:
-                continue
-            collector = (
-                FilteredElementCollector(doc, view.Id)
-                .OfCategory(cat)
-                .WhereElementIsNotElementType()
-            )
-            for element in collector:
-                color = get_color_func(element)
-                ogs   = make_override(color, solid_fill_id)
-                view.SetElementOverrides(element.Id, ogs)
-                count += 1
-        assemblies = (
-            FilteredElementCollector(doc, view.Id)
-            .OfCategory(BuiltInCategory.OST_Assemblies)
-            .WhereElementIsNotElementType()
+def selecionar_vistas(escopo, padrao):
+    if escopo == 1:
+        return all_3d_views(doc)
+    if escopo == 2:
+        sheets = forms.select_sheets(title="Selecione as folhas", button_name="Colorir")
+        return views_on_sheets(doc, sheets or [])
+    if escopo == 3:
+        return views_matching(doc, padrao)
+    return [view]
+
+
+def colorir(views, modo, transaction_name, descricao):
+    assembly_index = AssemblyIndex(doc, script.get_document_data_file("assembly_index", "json"))
+    contagem = apply_colors_generic(
+        doc,
+        views,
+        modo,
+        transaction_name,
+        snapshot,
+        assembly_index
+    )
+    assembly_index.save()
+    snapshot.save()
+    print(
+        "Cores de {} aplicadas a {} elementos em {} vista(s) ({} sem alteração, {} fora da vista).".format(
+            descricao, contagem["aplicadas"], len(views), contagem["inalteradas"], contagem["removidas"]
         )
-        for assembly in assemblies:
-            if not isinstance(assembly, AssemblyInstance):
-                continue
-            main_el = get_main_element(assembly)
-            color   = get_color_func(main_el)
-            ogs     = make_override(color, solid_fill_id)
-            view.SetElementOverrides(assembly.Id, ogs)
-            count += 1
-        t.Commit()
-    print("{} {} elementos.".format(msg, count))
-
-
-def apply_colors():
-    apply_colors_generic(
-        lambda el: get_color_for_status(get_status(el)),
-        "Colorir Modelo - Status",
-        "Cores de status aplicadas a"
     )
 
 
-def apply_revision_colors():
-    apply_colors_generic(
-        get_color_for_revisoes,
-        "Colorir Modelo - Revisões",
-        "Cores de revisão aplicadas a"
-    )
+def colorir_filtros(views, modo, transaction_name, descricao):
+    views, bloqueadas = split_filter_views(doc, views)
+    for vista in bloqueadas:
+        print(
+            "A vista '{}' foi ignorada: os filtros dela são controlados pelo modelo de vista."
+            .format(vista.Name)
+        )
+    if not views:
+        print("Nenhuma vista aceita filtros de coloração.")
+        return
+    # Overrides por elemento têm precedência sobre os filtros: desfaz os da coloração anterior
+    if clear_snapshot_overrides(doc, views, snapshot):
+        snapshot.save()
+    resultado = apply_filter_colors(doc, views, modo, transaction_name)
+    for nome_vista, motivo in resultado["ignoradas"]:
+        print("A vista '{}' não foi colorida: {}.".format(nome_vista, motivo))
+    print("{} filtros de {} aplicados em {} vista(s).".format(
+        resultado["filtros"], descricao, resultado["vistas"]
+    ))
+
+
+def apply_colors(views, usar_filtros=False):
+    if usar_filtros:
+        colorir_filtros(views, MODO_STATUS, "Colorir Modelo - Filtros de Status", "status")
+    else:
+        colorir(views, MODO_STATUS, "Colorir Modelo - Status", "status")
 
 
-def remove_colors():
-    count = 0
-    empty_ogs = OverrideGraphicSettings()
-    with Transaction(doc, "Colorir Modelo - Remover") as t:
-        t.Start()
-        for cat in categorias_interesse:
-            collector = (
-                FilteredElementCollector(doc, view.Id)
-                .OfCategory(cat)
-                .WhereElementIsNotElementType()
-            )
-            for element in collector:
-                view.SetElementOverrides(element.Id, empty_ogs)
-                count += 1
-        t.Commit()
-    print("Cores removidas de {} elementos.".format(count))
+def apply_revision_colors(views, usar_filtros=False):
+    if usar_filtros:
+        colorir_filtros(views, MODO_REVISOES, "Colorir Modelo - Filtros de Revisões", "revisão")
+    else:
+        colorir(views, MODO_REVISOES, "Colorir Modelo - Revisões", "revisão")
+
+
+def remove_colors(views):
+    count = remove_colors_view(doc, views, snapshot)
+    snapshot.save()
+    print("Cores removidas de {} elementos em {} vista(s).".format(count, len(views)))
 
 
 # MAIN
@@ -339,12 +193,18 @@ elif opcao_salva == "revisoes":
     window.radio_revisoes.IsChecked = True
 else:
     window.radio_atualizar.IsChecked = True
+window.check_filtros.IsChecked = getattr(config, "usar_filtros", False)
+window.combo_vistas.SelectedIndex = getattr(config, "escopo_vistas", 0)
+window.text_padrao.Text = getattr(config, "padrao_vistas", "")
 
 
 def aplicar(sender, args):
     atualizar = window.radio_atualizar.IsChecked
     revisoes  = window.radio_revisoes.IsChecked
     remover   = window.radio_remover.IsChecked
+    filtros   = window.check_filtros.IsChecked
+    escopo    = window.combo_vistas.SelectedIndex
+    padrao    = window.text_padrao.Text.strip()
 
     # Salvar estado
     if remover:
@@ -353,16 +213,28 @@ def aplicar(sender, args):
         config.opcao_colorir = "revisoes"
     else:
         config.opcao_colorir = "atualizar"
+    config.usar_filtros = filtros
+    config.escopo_vistas = escopo
+    config.padrao_vistas = padrao
     script.save_config()
 
     window.Close()
+    views = selecionar_vistas(escopo, padrao)
+    if not views:
+        print("Nenhuma vista que aceite cores foi encontrada para a opção escolhida.")
+        return
     try:
         if atualizar:
-            apply_colors()
+            apply_colors(views, filtros)
         elif revisoes:
-            apply_revision_colors()
+            apply_revision_colors(views, filtros)
         elif remover:
-            remove_colors()
+            remove_colors(views)
+    except ParametroAusenteError as e:
+        print(
+            "O parâmetro '{}' não existe no projeto. "
+            "Não é possível colorir por filtros de vista.".format(str(e))
+        )
     except Exception as e:
         error_msg = str(e).lower()
         if "central" in error_msg or "network" in error_msg or "workset" in error_msg:
@@ -23,7 +23,7 @@ try:
     default_xaml = """
 <Window xmlns="http://schemas.microsoft.com/winfx/2006/xaml/presentation"
         Title="Configurações"
-        Height="280"
+        Height="390"
         Width="460"
         WindowStartupLocation="CenterScreen"
         ResizeMode="NoResize">
@@ -45,11 +45,26 @@ try:
                        TextWrapping="Wrap"/>
         </CheckBox>
 
-        <CheckBox Name="check_include_pdf_names" Margin="0,0,0,20">
+        <CheckBox Name="check_include_pdf_names" Margin="0,0,0,10">
             <TextBlock Text="Sempre incluir nome dos arquivos de detalhamento na exportação?"
                        TextWrapping="Wrap"/>
         </CheckBox>
 
+        <CheckBox Name="check_batch_pdfs_run" Margin="0,0,0,10">
+            <TextBlock Text="Imprimir os PDFs de todas as peças em um único lote?"
+                       TextWrapping="Wrap"/>
+        </CheckBox>
+
+        <CheckBox Name="check_export_only_changed" Margin="0,0,0,10">
+            <TextBlock Text="Exportar apenas as peças alteradas desde a última exportação?"
+                       TextWrapping="Wrap"/>
+        </CheckBox>
+
+        <CheckBox Name="check_import_only_changed" Margin="0,0,0,20">
+            <TextBlock Text="Importar XML apenas nas peças com código, status ou data alterados?"
+                       TextWrapping="Wrap"/>
+        </CheckBox>
+
         <StackPanel Orientation="Horizontal"
                     HorizontalAlignment="Right">
 
@@ -69,10 +84,9 @@ try:
 </Window>
 """
 
-    # Criar XAML se não existir
-    if not os.path.exists(xaml_path):
-        with io.open(xaml_path, "w", encoding="utf-8") as f:
-            f.write(default_xaml)
+    # Sempre atualizar o XAML
+    with io.open(xaml_path, "w", encoding="utf-8") as f:
+        f.write(default_xaml)
 
     # Abrir janela
     window = forms.WPFWindow(xaml_path)
@@ -81,6 +95,9 @@ try:
     window.check_print_pdf.IsChecked = getattr(config, "print_pdfs", True)
     window.check_overwrite_pdf.IsChecked = getattr(config, "overwrite_pdfs", False)
     window.check_include_pdf_names.IsChecked = getattr(config, "include_pdf_names", False)
+    window.check_batch_pdfs_run.IsChecked = getattr(config, "batch_pdfs_run", False)
+    window.check_export_only_changed.IsChecked = getattr(config, "export_only_changed", False)
+    window.check_import_only_changed.IsChecked = getattr(config, "import_only_changed", False)
 
     # Evento dos botões
     def salvar(sender, args):
@@ -88,6 +105,9 @@ try:
         config.print_pdfs = window.check_print_pdf.IsChecked
         config.overwrite_pdfs = window.check_overwrite_pdf.IsChecked
         config.include_pdf_names = window.check_include_pdf_names.IsChecked
+        config.batch_pdfs_run = window.check_batch_pdfs_run.IsChecked
+        config.export_only_changed = window.check_export_only_changed.IsChecked
+        config.import_only_changed = window.check_import_only_changed.IsChecked
 
         script.save_config()
 
@@ -14,11 +14,28 @@ import os
 import sys
 import math
 import datetime
-import time
 import re
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 import xml.etree.ElementTree as ET
+from Snippets._assemblies import AssemblyIndex
+from Snippets._cache import ElementValueStore, ParameterCache
+from Snippets._export import (
+    collect_model_pieces,
+    filter_elements,
+    get_main_element,
+    get_nome_peca,
+    group_elements,
+    incomplete_model_pieces,
+    required_parameters_filter,
+    xml_unit_data,
+    xml_unit_parts,
+)
+from Snippets._fingerprint import ExportFingerprints, piece_fingerprint, unit_fingerprint
+from Snippets._params import ParametroAusenteError
+from Snippets._sheets import SheetIndex, export_sheets_batch
+from Snippets._utils import model_data_path, natural_key
+from Snippets._xmlwriter import PlannixXmlWriter, XmlEscaper
 
 # HARD VARIABLES
 doc = __revit__.ActiveUIDocument.Document
@@ -30,6 +47,8 @@ config = script.get_config("PlannixProject")
 gerar_pdfs = getattr(config, "print_pdfs", None)
 sobrescrever_pdfs = getattr(config, "overwrite_pdfs", None)
 incluir_nomes_pdf = getattr(config, "include_pdf_names", False)
+pdfs_em_lote_unico = getattr(config, "batch_pdfs_run", False)
+somente_alteradas = getattr(config, "export_only_changed", False)
 if gerar_pdfs is None:
     print("Caiu no Fallback.")
     gerar_pdfs = True
@@ -38,26 +57,6 @@ if sobrescrever_pdfs is None:
     sobrescrever_pdfs = False
 
 # SOFT VARIABLES
-NOMEPECA = "Modelo"
-MARCA = "Marca"
-CODCONTROLE = ""
-DESENHO = ""
-TIPOPRODUTO = "03. PRODUTO"
-GRUPO = "04. GRUPO"
-SECAO = "05. SEÇÃO"
-INFOADICIONAL = "09. INFO ADICIONAL"
-COMPRIMENTO = "08. COMPRIMENTO"
-ALTURA = "07. ALTURA"
-LARGURA = "06. LARGURA"
-VOLUMEUNITARIO = "Volume"
-PESO = "Peso"
-AREA = ""
-CLASSECONCRETO = "12. FCK"
-ACABAMENTO = ""
-COBRIMENTO = "13. COBRIMENTO"
-OBS = ""
-TABELAACO = ""
-COMPLEMENTOS = ""
 OBRA = "Obra da Serpa"
 OBRAPARAM = ""
 NAME = "Serpa"
@@ -100,707 +99,21 @@ def reject_invalid(list_of_elements):
     return accepted_elements
 
 
-def natural_key(text):
-    return [
-        int(part) if part.isdigit() else part.lower()
-        for part in re.split(r"(\d+)", text)
-    ]
-
-
-def safe_float(value):
-    if not value:
-        return 0.0
-    try:
-        return float(value.replace(",", "."))
-    except:
-        return 0.0
-
-
-def group_elements(elements):
-    grupos = {}
-    for element in elements:
-        nomepeca = get_nome_peca(element)
-        tipoproduto = parameter_get(element, TIPOPRODUTO)
-        grupo = parameter_get(element, GRUPO)
-        secao = parameter_get(element, SECAO)
-        infoadicional = parameter_get(element, INFOADICIONAL)
-        comprimento = parameter_get(element, COMPRIMENTO)
-        altura = parameter_get(element, ALTURA)
-        largura = parameter_get(element, LARGURA)
-        volumeunitario = parameter_get(element, VOLUMEUNITARIO)
-        peso = parameter_get(element, PESO)
-        area = parameter_get(element, AREA)
-        classeconcreto = parameter_get(element, CLASSECONCRETO)
-        acabamento = parameter_get(element, ACABAMENTO)
-        cobrimento = parameter_get(element, COBRIMENTO)
-        obs = parameter_get(element, OBS)
-        tabelaaco = parameter_get(element, TABELAACO)
-        complementos = parameter_get(element, COMPLEMENTOS)
-        chave = (
-            nomepeca,
-            tipoproduto,
-            grupo,
-            secao,
-            infoadicional,
-        )
-        comprimento_f = safe_float(comprimento)
-        altura_f = safe_float(altura)
-        largura_f = safe_float(largura)
-        volume_f = safe_float(volumeunitario)
-        if element.AssemblyInstanceId != ElementId.InvalidElementId:
-            assembly = doc.GetElement(element.AssemblyInstanceId)
-            fck_principal = classeconcreto
-            for mid in assembly.GetMemberIds():
-                membro = doc.GetElement(mid)
-                if not membro or not membro.Category:
-                    continue
-                if membro.Id == element.Id:
-                    continue
-                param_volume = membro.LookupParameter("Volume")
-                if not param_volume:
-                    continue
-                try:
-                    volume_ft3 = param_volume.AsDouble()
-                    volume_m3 = volume_ft3 * 0.028316846592
-                except:
-                    continue
-                if volume_m3 <= 0:
-                    continue
-                type_id = membro.GetTypeId()
-                if not type_id or type_id == ElementId.InvalidElementId:
-                    continue
-                element_type = doc.GetElement(type_id)
-                if not element_type:
-                    continue
-                param_fck = element_type.LookupParameter(CLASSECONCRETO)
-                if not param_fck:
-                    continue
-                fck_membro = param_fck.AsValueString()
-                if fck_membro and fck_principal and fck_membro == fck_principal:
-                    volume_f += volume_m3
-        peso_f = safe_float(peso)
-        area_f = safe_float(area)
-        if chave not in grupos:
-            grupos[chave] = {
-                "elemento_base": element,
-                "quantidade": 1,
-                "ids": [element.UniqueId],
-                "soma_comprimento": comprimento_f,
-                "soma_altura": altura_f,
-                "soma_largura": largura_f,
-                "soma_volume": volume_f,
-                "soma_peso": peso_f,
-                "soma_area": area_f,
-                "classeconcreto": classeconcreto,
-                "acabamento": acabamento,
-                "cobrimento": cobrimento,
-                "obs": obs,
-                "tabelaaco": tabelaaco,
-                "complementos": complementos,
-            }
-        else:
-            grupos[chave]["quantidade"] += 1
-            grupos[chave]["ids"].append(element.UniqueId)
-            grupos[chave]["soma_comprimento"] += comprimento_f
-            grupos[chave]["soma_altura"] += altura_f
-            grupos[chave]["soma_largura"] += largura_f
-            grupos[chave]["soma_volume"] += volume_f
-            grupos[chave]["soma_peso"] += peso_f
-            grupos[chave]["soma_area"] += area_f
-    return grupos
-
-
-def get_main_element(element):
-    categorias_principais = [
-        BuiltInCategory.OST_StructuralColumns,
-        BuiltInCategory.OST_StructuralFraming,
-        BuiltInCategory.OST_StructuralFoundation,
-        BuiltInCategory.OST_Walls,
-        BuiltInCategory.OST_Floors,
-    ]
-    if not isinstance(element, AssemblyInstance):
-        return element
-    for member_id in element.GetMemberIds():
-        member = doc.GetElement(member_id)
-        if not member or not member.Category:
-            continue
-        if member.Category.Id.IntegerValue in [int(c) for c in categorias_principais]:
-            return member
-    print(
-        "A montagem '{}' não possui uma peça principal válida para exportação."
-        .format(element.Id)
-    )
-    return None
-
-
-def get_nome_peca(element):
-    modelo = parameter_get(element, NOMEPECA)
-    marca = parameter_get(element, MARCA)
-    if modelo and marca:
-        return "{}{}".format(modelo, marca)
-    elif modelo:
-        return modelo
-    else:
-        return str(element.Id)
-
-
-def clean_xml_text(value, parameter_name, element):
-    if value is None:
-        return ""
-    original_value = value
-    sanitized_value = value
-    caracteres_invalidos = ['&', '<', '>', '"', "'"]
-    for c in caracteres_invalidos:
-        if c in sanitized_value:
-            sanitized_value = sanitized_value.replace(c, "")
-            nome_peca = get_nome_peca(element)
-            print(
-                "O caractere '{}' do texto '{}' do parâmetro '{}' da peça '{}' "
-                "foi removido do xml para preservar a validade do arquivo."
-                .format(c, original_value, parameter_name, nome_peca)
-            )
-    return sanitized_value
-
-
-def parameter_get(element, parameter_name):
-    if parameter_name == "":
-        return ""
-    param_instance = element.LookupParameter(parameter_name)
-    if param_instance:
-        if parameter_name == VOLUMEUNITARIO:
-            try:
-                volume_ft3 = param_instance.AsDouble()
-                volume_m3 = volume_ft3 * 0.028316846592
-                # print(
-                #     "Parâmetro de instância '{}' encontrado. Valor: {}"
-                #     .format(parameter_name, volume_m3)
-                # )
-                return "{:.3f}".format(volume_m3)
-            except:
-                return ""
-        if parameter_name == PESO:
-            try:
-                valor = param_instance.AsDouble()
-                # print(
-                #     "Parâmetro de instância '{}' encontrado. Valor: {}"
-                #     .format(parameter_name, valor)
-                # )
-                return "{:.3f}".format(valor)
-            except:
-                value = param_instance.AsValueString()
-                if not value:
-                    return ""
-                # print(
-                #     "Parâmetro de instância '{}' encontrado. Valor: {}"
-                #     .format(parameter_name, value)
-                # )
-                return clean_xml_text(value.replace(",", "."), parameter_name, element)
-        value = param_instance.AsValueString()
-        if not value:
-            return ""
-        # print(
-        #     "Parâmetro de instância '{}' encontrado. Valor: {}"
-        #     .format(parameter_name, value)
-        # )
-        return clean_xml_text(value.replace(",", "."), parameter_name, element)
-    type_id = element.GetTypeId()
-    if type_id and type_id != ElementId.InvalidElementId:
-        element_type = doc.GetElement(type_id)
-        if element_type:
-            param_type = element_type.LookupParameter(parameter_name)
-            if param_type:
-                if parameter_name == VOLUMEUNITARIO:
-                    try:
-                        volume_ft3 = param_type.AsDouble()
-                        volume_m3 = volume_ft3 * 0.028316846592
-                        # print(
-                        #     "Parâmetro de tipo '{}' encontrado. Valor: {}"
-                        #     .format(parameter_name, volume_m3)
-                        # )
-                        return "{:.3f}".format(volume_m3)
-                    except:
-                        return ""
-                if parameter_name == PESO:
-                    try:
-                        valor = param_type.AsDouble()
-                        # print(
-                        #     "Parâmetro de tipo '{}' encontrado. Valor: {}"
-                        #     .format(parameter_name, valor)
-                        # )
-                        return "{:.3f}".format(valor)
-                    except:
-                        value = param_type.AsValueString()
-                        if not value:
-                            return ""
-                        # print(
-                        #     "Parâmetro de tipo '{}' encontrado. Valor: {}"
-                        #     .format(parameter_name, value)
-                        # )
-                        return clean_xml_text(value.replace(",", "."), parameter_name, element)
-                value = param_type.AsValueString()
-                if not value:
-                    return ""
-                # print(
-                #     "Parâmetro de tipo '{}' encontrado. Valor: {}"
-                #     .format(parameter_name, value)
-                # )
-                return clean_xml_text(value.replace(",", "."), parameter_name, element)
-    # print(
-    #     "Parâmetro '{}' não foi encontrado."
-    #     .format(parameter_name)
-    # )
-    return ""
-
-
-def filter_elements(list_of_elements):
-    accepted_output = []
-    parametros_obrigatorios = [
-        NOMEPECA,
-        TIPOPRODUTO,
-        GRUPO,
-        SECAO,
-        INFOADICIONAL,
-        COMPRIMENTO,
-        VOLUMEUNITARIO
-    ]
-    for element in list_of_elements:
-        elemento_valido = True
-        nome_para_print = get_nome_peca(element)
-        is_pilar = (
-            element.Category
-            and element.Category.Id.IntegerValue == int(BuiltInCategory.OST_StructuralColumns)
-        )
-        for parametro in parametros_obrigatorios:
-            parametro_real = parametro
-            if is_pilar and parametro == COMPRIMENTO:
-                parametro_real = ALTURA
-            param_instancia = element.LookupParameter(parametro_real)
-            param_tipo = None
-            if not param_instancia:
-                type_id = element.GetTypeId()
-                if type_id and type_id != ElementId.InvalidElementId:
-                    element_type = doc.GetElement(type_id)
-                    if element_type:
-                        param_tipo = element_type.LookupParameter(parametro_real)
-            param = param_instancia or param_tipo
-            if not param:
-                print(
-                    "O elemento '{}' foi removido porque não possui o parâmetro "
-                    "obrigatório '{}' definido."
-                    .format(nome_para_print, parametro_real)
-                )
-                elemento_valido = False
-                break
-            valor = param.AsValueString()
-            if valor is None or valor == "":
-                print(
-                    "O elemento '{}' foi removido porque está com o parâmetro "
-                    "obrigatório '{}' vazio."
-                    .format(nome_para_print, parametro_real)
-                )
-                elemento_valido = False
-                break
-        if elemento_valido:
-            accepted_output.append(element)
-    return accepted_output
-
-
-def build_tabela_aco_xml(element):
-    if element.AssemblyInstanceId == ElementId.InvalidElementId:
-        return ""
-    assembly = doc.GetElement(element.AssemblyInstanceId)
-    if not isinstance(assembly, AssemblyInstance):
-        return ""
-    FABRIC_CAT = int(BuiltInCategory.OST_FabricReinforcement)
-    REBAR_CAT = int(BuiltInCategory.OST_Rebar)
-
-    def limpar_bitola(bitola):
-        if not bitola:
-            return ""
-        bitola = bitola.replace("Ø", "")
-        bitola = bitola.replace("RB", "")
-        return bitola.strip()
-
-    def natural_key(text):
-        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', text)]
-
-    grupos = {}
-    telas = {}
-    for mid in assembly.GetMemberIds():
-        membro = doc.GetElement(mid)
-        if not membro or not membro.Category:
-            continue
-        categoria_id = membro.Category.Id.IntegerValue
-        if categoria_id == FABRIC_CAT:
-            tela_type = doc.GetElement(membro.GetTypeId())
-            param_material = tela_type.LookupParameter("Material")
-            tipo = param_material.AsValueString() if param_material else "TELA"
-            param_bitola = tela_type.LookupParameter("Nome do tipo")
-            bitola = limpar_bitola(param_bitola.AsString() if param_bitola else "")
-            param_massa = membro.LookupParameter("Massa da folha de corte")
-            massa_kg = 0
-            if param_massa:
-                try:
-                    massa_kg = UnitUtils.ConvertFromInternalUnits(
-                        param_massa.AsDouble(),
-                        UnitTypeId.Kilograms
-                    )
-                except:
-                    massa_kg = 0
-            chave = (tipo, bitola)
-            if chave not in telas:
-                telas[chave] = 0
-            telas[chave] += massa_kg
-            continue
-        if categoria_id != REBAR_CAT:
-            continue
-        rebar = membro
-        rebar_type = doc.GetElement(rebar.GetTypeId())
-        param_material = rebar_type.LookupParameter("Material")
-        material = param_material.AsValueString() if param_material else ""
-        if material and material.upper().startswith("TELA"):
-            continue
-        param_pos = rebar.LookupParameter("Número do vergalhão")
-        if not param_pos:
-            continue
-        if param_pos.StorageType == StorageType.Integer:
-            numero_str = str(param_pos.AsInteger())
-        elif param_pos.StorageType == StorageType.String:
-            numero_str = param_pos.AsString()
-        else:
-            numero_str = param_pos.AsValueString()
-        if not numero_str:
-            continue
-        posicao = "N{}".format(numero_str.strip())
-        param_qtde = rebar.LookupParameter("Quantidade")
-        qtde = param_qtde.AsInteger() if param_qtde else 0
-        param_comp = rebar.LookupParameter("Comprimento total da barra")
-        if not param_comp:
-            continue
-        comprimento_m = UnitUtils.ConvertFromInternalUnits(
-            param_comp.AsDouble(),
-            UnitTypeId.Meters
-        )
-        param_bitola = rebar_type.LookupParameter("Nome do tipo")
-        bitola = limpar_bitola(param_bitola.AsString() if param_bitola else "")
-        fator_peso = None
-        param_fator = rebar_type.LookupParameter("Fator de Peso")
-        if param_fator:
-            try:
-                fator_peso = UnitUtils.ConvertFromInternalUnits(
-                    param_fator.AsDouble(),
-                    UnitTypeId.KilogramsPerMeter
-                )
-            except:
-                fator_peso = None
-        produto = "ACO"
-        tipo = material
-        chave = (posicao, produto, tipo, bitola)
-        if chave not in grupos:
-            grupos[chave] = {
-                "qtde": 0,
-                "comp_total": 0.0,
-                "fator_peso": fator_peso
-            }
-        grupos[chave]["qtde"] += qtde
-        grupos[chave]["comp_total"] += comprimento_m
-    xml_posicoes = ""
-    for chave in sorted(grupos.keys(), key=lambda x: natural_key(x[0])):
-        posicao, produto, tipo, bitola = chave
-        valores = grupos[chave]
-        comp_total_original = valores["comp_total"]
-        fator_peso = valores.get("fator_peso")
-        if fator_peso is None:
-            comp_total_fatorado = comp_total_original
-        else:
-            comp_total_fatorado = comp_total_original * fator_peso
-        xml_posicoes += (
-            "\t\t\t<POSICAO>\n"
-            "\t\t\t\t<POS>{}</POS>\n"
-            "\t\t\t\t<PRODUTO>{}</PRODUTO>\n"
-            "\t\t\t\t<TIPO>{}</TIPO>\n"
-            "\t\t\t\t<BITOLA>{}</BITOLA>\n"
-            "\t\t\t\t<QTDE>{}</QTDE>\n"
-            "\t\t\t\t<COMP_TOTAL>{:.3f}</COMP_TOTAL>\n"
-            "\t\t\t</POSICAO>\n"
-        ).format(
-            posicao,
-            produto,
-            tipo,
-            bitola,
-            valores["qtde"],
-            comp_total_fatorado
-        )
-    contador_tela = 1
-    for chave, peso_total in telas.items():
-        tipo, bitola = chave
-        posicao = "T{}".format(contador_tela)
-        xml_posicoes += (
-            "\t\t\t<POSICAO>\n"
-            "\t\t\t\t<POS>{}</POS>\n"
-            "\t\t\t\t<PRODUTO>ACO</PRODUTO>\n"
-            "\t\t\t\t<TIPO>{}</TIPO>\n"
-            "\t\t\t\t<BITOLA>{}</BITOLA>\n"
-            "\t\t\t\t<QTDE>1</QTDE>\n"
-            "\t\t\t\t<COMP_TOTAL>{:.3f}</COMP_TOTAL>\n"
-            "\t\t\t</POSICAO>\n"
-        ).format(
-            posicao,
-            tipo,
-            bitola,
-            peso_total
-        )
-        contador_tela += 1
-    return xml_posicoes
-
-
-def get_parameter_instance_or_type(element, param_name):
-    param = element.LookupParameter(param_name)
-    if not param:
-        type_id = element.GetTypeId()
-        if type_id and type_id != ElementId.InvalidElementId:
-            element_type = doc.GetElement(type_id)
-            if element_type:
-                param = element_type.LookupParameter(param_name)
-    return param
-
-
-def build_complementos_xml(element):
-    if element.AssemblyInstanceId == ElementId.InvalidElementId:
-        return ""
-    assembly = doc.GetElement(element.AssemblyInstanceId)
-    if not isinstance(assembly, AssemblyInstance):
-        return ""
-    grupos_estruturais = {}
-    grupos_acessorios = {}
-    for mid in assembly.GetMemberIds():
-        membro = doc.GetElement(mid)
-        if not membro or not membro.Category:
-            continue
-        if membro.Id == element.Id:
-            continue
-        param_volume = membro.LookupParameter(VOLUMEUNITARIO)
-        volume_m3 = 0
-        if param_volume:
-            try:
-                volume_ft3 = param_volume.AsDouble()
-                volume_m3 = volume_ft3 * 0.028316846592
-            except:
-                volume_m3 = 0
-        fck = parameter_get(membro, CLASSECONCRETO)
-        produto = parameter_get(membro, TIPOPRODUTO)
-        if volume_m3 > 0 and fck and produto:
-            grupo_param = get_parameter_instance_or_type(membro, GRUPO)
-            grupo_val = grupo_param.AsValueString() if grupo_param else ""
-            if grupo_val == "COMPLEMENTO ESTRUTURAL":
-                chave = produto
-                if chave not in grupos_estruturais:
-                    grupos_estruturais[chave] = 0
-                grupos_estruturais[chave] += 1
-        param_desc = get_parameter_instance_or_type(membro, "ERP. DESCRIÇÃO")
-        if not param_desc:
-            continue
-        desc = param_desc.AsValueString()
-        if not desc:
-            continue
-        # Filtro 1: verificar "ERP. ETAPA"
-        etapas_validas = ["ARMAÇÃO", "CONCRETAGEM", "ACABAMENTO"]
-        param_etapa = get_parameter_instance_or_type(membro, "ERP. ETAPA")
-        if not param_etapa:
-            continue
-        etapa = param_etapa.AsValueString()
-        if not etapa or etapa.upper() not in etapas_validas:
-            continue
-        # Filtro 2: verificar "ERP. CÓDIGO da FAMÍLIA"
-        param_item = get_parameter_instance_or_type(membro, "ERP. CÓDIGO da FAMÍLIA")
-        if not param_item:
-            continue
-        item = param_item.AsValueString()
-        if not item or item.upper() == "NÃO CONTABILIZAR":
-            continue
-        param_comp = get_parameter_instance_or_type(membro, "_COMPRIMENTO")
-        param_unid = get_parameter_instance_or_type(membro, "ERP. UNIDADE")
-        if not param_unid:
-            continue
-        unid = param_unid.AsValueString()
-        comprimento_val = None
-        if param_comp:
-            try:
-                if param_comp.StorageType == StorageType.Double:
-                    comprimento_val = UnitUtils.ConvertFromInternalUnits(
-                        param_comp.AsDouble(),
-                        UnitTypeId.Meters
-                    )
-                else:
-                    comp_str = param_comp.AsValueString()
-                    if comp_str:
-                        comprimento_val = float(comp_str.replace(",", "."))
-            except:
-                comprimento_val = None
-        chave = (item, desc, unid, comprimento_val)
-        if chave not in grupos_acessorios:
-            grupos_acessorios[chave] = 0
-        grupos_acessorios[chave] += 1
-    xml_complementos = ""
-    estruturais_ordenados = sorted(grupos_estruturais.keys(), key=lambda x: x.lower())
-    for produto in estruturais_ordenados:
-        qtde = grupos_estruturais[produto]
-        item = str(element.Id.IntegerValue)
-        desc = produto
-        unid = "UN"
-        xml_complementos += (
-            "\t\t\t<ACESSORIO>\n"
-            "\t\t\t\t<ITEM>{}</ITEM>\n"
-            "\t\t\t\t<DESC>{}</DESC>\n"
-            "\t\t\t\t<QTDE>{}</QTDE>\n"
-            "\t\t\t\t<UNID>{}</UNID>\n"
-            "\t\t\t</ACESSORIO>\n"
-        ).format(item, desc, qtde, unid)
-    acessorios_ordenados = sorted(
-        grupos_acessorios.keys(),
-        key=lambda x: x[1].lower()
-    )
-    for chave in acessorios_ordenados:
-        item, desc, unid, comprimento_val = chave
-        qtde = grupos_acessorios[chave]
-        if comprimento_val is not None:
-            qtde_final = float(comprimento_val) * float(qtde)
-            qtde_str = "{:.3f}".format(qtde_final)
-        else:
-            qtde_str = str(qtde)
-        xml_complementos += (
-            "\t\t\t<ACESSORIO>\n"
-            "\t\t\t\t<ITEM>{}</ITEM>\n"
-            "\t\t\t\t<DESC>{}</DESC>\n"
-            "\t\t\t\t<QTDE>{}</QTDE>\n"
-            "\t\t\t\t<UNID>{}</UNID>\n"
-            "\t\t\t</ACESSORIO>\n"
-        ).format(item, desc, qtde_str, unid)
-    return xml_complementos
-
-
 def get_pdf_names(nome_peca, directory_path):
     """Calcula os nomes dos PDFs que seriam gerados para uma peça, sem exportar."""
-    collector = FilteredElementCollector(doc).OfClass(ViewSheet)
-    sheets = []
-    for sheet in collector:
-        param_tema = sheet.LookupParameter("Tema da Vista")
-        if not param_tema:
-            continue
-        tema = param_tema.AsValueString()
-        if tema != nome_peca:
-            continue
-        param_numero = sheet.LookupParameter("Número da folha")
-        if not param_numero:
-            continue
-        numero_folha = param_numero.AsValueString()
-        if not numero_folha:
-            continue
-        sheets.append((numero_folha, sheet))
-    if not sheets:
-        return []
-    sheets_sorted = sorted(sheets, key=lambda x: natural_key(x[0]))
-    pdf_names = []
-    for numero_folha, sheet in sheets_sorted:
-        param_nome = sheet.LookupParameter("Nome da folha")
-        nome_folha = param_nome.AsValueString() if param_nome else ""
-        param_tema = sheet.LookupParameter("Tema da Vista")
-        tema = param_tema.AsValueString() if param_tema else ""
-
-        def sanitize_filename(text):
-            if not text:
-                return ""
-            return re.sub(r'[\\/*?:"<>|]', "", text)
-
-        tema_clean = sanitize_filename(tema)
-        nome_clean = sanitize_filename(nome_folha)
-        base_name = "{} - {}".format(tema_clean, nome_clean).strip()
-        pdf_names.append(base_name + ".pdf")
-    return pdf_names
+    return sheet_index.pdf_names(nome_peca)
 
 
 def export_sheets_pdf(nome_peca, directory_path, sobrescrever, selected_elements=None, is_last=False):
     if not hasattr(export_sheets_pdf, "selection_cleared"):
         uidoc.Selection.SetElementIds(List[ElementId]())
         export_sheets_pdf.selection_cleared = True
-    collector = FilteredElementCollector(doc).OfClass(ViewSheet)
-    sheets = []
-    for sheet in collector:
-        param_tema = sheet.LookupParameter("Tema da Vista")
-        if not param_tema:
-            continue
-        tema = param_tema.AsValueString()
-        if tema != nome_peca:
-            continue
-        param_numero = sheet.LookupParameter("Número da folha")
-        if not param_numero:
-            continue
-        numero_folha = param_numero.AsValueString()
-        if not numero_folha:
-            continue
-        sheets.append((numero_folha, sheet))
-    if not sheets:
+    folhas = sheet_index.get(nome_peca)
+    if not folhas:
         return []
-    sheets_sorted = sorted(sheets, key=lambda x: natural_key(x[0]))
-    pdf_names = []
-    for numero_folha, sheet in sheets_sorted:
-        pdfs_antes = [
-            os.path.join(directory_path, f)
-            for f in os.listdir(directory_path)
-            if f.lower().endswith(".pdf")
-        ]
-        view_ids = List[ElementId]()
-        view_ids.Add(sheet.Id)
-        options = PDFExportOptions()
-        options.Combine = False
-        options.HideCropBoundaries = False
-        doc.Export(directory_path, view_ids, options)
-        time.sleep(0.7)
-        pdfs_depois = [
-            os.path.join(directory_path, f)
-            for f in os.listdir(directory_path)
-            if f.lower().endswith(".pdf")
-        ]
-        novos = list(set(pdfs_depois) - set(pdfs_antes))
-        if novos:
-            pdf_criado = novos[0]
-        else:
-            pdf_criado = max(pdfs_depois, key=os.path.getctime)
-        param_nome = sheet.LookupParameter("Nome da folha")
-        nome_folha = param_nome.AsValueString() if param_nome else ""
-        param_tema = sheet.LookupParameter("Tema da Vista")
-        tema = param_tema.AsValueString() if param_tema else ""
-
-        def sanitize_filename(text):
-            if not text:
-                return ""
-            return re.sub(r'[\\/*?:"<>|]', "", text)
-
-        tema_clean = sanitize_filename(tema)
-        nome_clean = sanitize_filename(nome_folha)
-        base_name = "{} - {}".format(tema_clean, nome_clean).strip()
-        new_name = base_name + ".pdf"
-        new_path = os.path.join(directory_path, new_name)
-        if os.path.exists(new_path):
-            if sobrescrever:
-                try:
-                    os.remove(new_path)
-                except:
-                    pass
-            else:
-                counter = 1
-                while True:
-                    new_name = "{} ({}){}.pdf".format(base_name, counter, "")
-                    new_path = os.path.join(directory_path, new_name)
-                    if not os.path.exists(new_path):
-                        break
-                    counter += 1
-        try:
-            os.rename(pdf_criado, new_path)
-        except:
-            import shutil
-            shutil.move(pdf_criado, new_path)
-        pdf_names.append(os.path.basename(new_path))
+    nomes = export_sheets_batch(doc, folhas, directory_path, sobrescrever, sheet_index.tema_param_id)
+    pdf_names = [nomes[folha.sheet.Id.IntegerValue] for folha in folhas]
+    pdf_names = [nome for nome in pdf_names if nome]
     if is_last and selected_elements:
         ids = List[ElementId]([e.Id for e in selected_elements if e and e.IsValidObject])
         uidoc.Selection.SetElementIds(ids)
@@ -809,73 +122,31 @@ def export_sheets_pdf(nome_peca, directory_path, sobrescrever, selected_elements
     return pdf_names
 
 
-def xml_unit_build(selected_element, grupo, desenhos_pdf=None):
-    quantidade = grupo["quantidade"]
-    ids = grupo["ids"]
-    nomepeca = get_nome_peca(selected_element)
-    codcontrole = parameter_get(selected_element, CODCONTROLE)
-    if desenhos_pdf:
-        desenho = ";".join(desenhos_pdf)
-    else:
-        desenho = parameter_get(selected_element, DESENHO)
-    tipoproduto = parameter_get(selected_element, TIPOPRODUTO)
-    grupo_nome = parameter_get(selected_element, GRUPO)
-    secao = parameter_get(selected_element, SECAO)
-    infoadicional = parameter_get(selected_element, INFOADICIONAL)
-    media_comprimento = grupo["soma_comprimento"] / quantidade if quantidade else 0
-    media_altura = grupo["soma_altura"] / quantidade if quantidade else 0
-    media_largura = grupo["soma_largura"] / quantidade if quantidade else 0
-    media_volume = grupo["soma_volume"] / quantidade if quantidade else 0
-    classeconcreto = grupo.get("classeconcreto", "")
-    acabamento = grupo.get("acabamento", "")
-    cobrimento = grupo.get("cobrimento", "")
-    obs = grupo.get("obs", "")
-    tabelaaco = build_tabela_aco_xml(selected_element)
-    complementos = build_complementos_xml(selected_element)
-    altura_m = media_altura / 100.0
-    largura_m = media_largura / 100.0
-    comprimento = "{:.3f}".format(media_comprimento)
-    altura = "{:.3f}".format(altura_m)
-    largura = "{:.3f}".format(largura_m)
-    volumeunitario = "{:.3f}".format(media_volume)
-    peso_valor = media_volume * 2500
-    peso = "{:.3f}".format(peso_valor)
-    area_valor = altura_m * largura_m
-    area = "{:.3f}".format(area_valor)
-    xml_peca_open = "\t<PECA>\n"
-    xml_peca_close = "\t</PECA>\n"
-    xml_listaid = "\t\t<LISTAID>\n"
-    for uid in ids:
-        xml_listaid += "\t\t\t<ID>{}</ID>\n".format(uid)
-    xml_listaid += "\t\t</LISTAID>\n"
-    xml_tabelaaco = "\t\t<TABELAACO>\n" + tabelaaco + "\t\t</TABELAACO>\n"
-    xml_complementos = "\t\t<COMPLEMENTOS>\n" + complementos + "\t\t</COMPLEMENTOS>\n"
-    element_unit_string = (
-        xml_peca_open +
-        "\t\t<NOMEPECA>" + nomepeca + "</NOMEPECA>\n" +
-        "\t\t<CODCONTROLE>" + codcontrole + "</CODCONTROLE>\n" +
-        "\t\t<DESENHO>" + desenho + "</DESENHO>\n" +
-        "\t\t<TIPOPRODUTO>" + tipoproduto + "</TIPOPRODUTO>\n" +
-        "\t\t<GRUPO>" + grupo_nome + "</GRUPO>\n" +
-        "\t\t<SECAO>" + secao + "</SECAO>\n" +
-        "\t\t<INFOADICIONAL>" + infoadicional + "</INFOADICIONAL>\n" +
-        "\t\t<QUANTIDADE>{}</QUANTIDADE>\n".format(quantidade) +
-        "\t\t<COMPRIMENTO>" + comprimento + "</COMPRIMENTO>\n" +
-        "\t\t<ALTURA>" + altura + "</ALTURA>\n" +
-        "\t\t<LARGURA>" + largura + "</LARGURA>\n" +
-        "\t\t<VOLUMEUNITARIO>" + volumeunitario + "</VOLUMEUNITARIO>\n" +
-        "\t\t<PESO>" + peso + "</PESO>\n" +
-        "\t\t<AREA>" + area + "</AREA>\n" +
-        "\t\t<CLASSECONCRETO>" + classeconcreto + "</CLASSECONCRETO>\n" +
-        "\t\t<ACABAMENTO>" + acabamento + "</ACABAMENTO>\n" +
-        "\t\t<COBRIMENTO>" + cobrimento + "</COBRIMENTO>\n" +
-        "\t\t<OBS>" + obs + "</OBS>\n" +
-        xml_listaid +
-        xml_tabelaaco +
-        xml_complementos +
-        xml_peca_close
-    )
-    return element_unit_string
+def export_all_sheets_pdf(nomes_pecas, directory_path, sobrescrever, selected_elements=None):
+    """Exporta as folhas de todas as peças em um único lote e retorna os PDFs por peça."""
+    uidoc.Selection.SetElementIds(List[ElementId]())
+    folhas_por_peca = {}
+    folhas = []
+    vistas = set()
+    for nome_peca in nomes_pecas:
+        folhas_peca = sheet_index.get(nome_peca)
+        folhas_por_peca[nome_peca] = folhas_peca
+        for folha in folhas_peca:
+            if folha.sheet.Id.IntegerValue in vistas:
+                continue
+            vistas.add(folha.sheet.Id.IntegerValue)
+            folhas.append(folha)
+    nomes = {}
+    if folhas:
+        nomes = export_sheets_batch(doc, folhas, directory_path, sobrescrever, sheet_index.tema_param_id)
+    if selected_elements:
+        ids = List[ElementId]([e.Id for e in selected_elements if e and e.IsValidObject])
+        uidoc.Selection.SetElementIds(ids)
+    pdfs_por_peca = {}
+    for nome_peca, folhas_peca in folhas_por_peca.items():
+        pdf_names = [nomes[folha.sheet.Id.IntegerValue] for folha in folhas_peca]
+        pdfs_por_peca[nome_peca] = [nome for nome in pdf_names if nome]
+    return pdfs_por_peca
 
 
 def atualizar_parametros_exportacao(elementos):
@@ -909,26 +180,73 @@ def atualizar_parametros_exportacao(elementos):
         t.Commit()
 
 
-# MAIN CODE
+def escrever_peca(xml_writer, elemento, grupo, pdf_files, impressoes=None):
+    """Grava a peça no XML; com `impressoes`, guarda nela a impressão do conteúdo gravado."""
+    unidade = xml_unit_data(cache, escaper, elemento, grupo, pdf_files)
+    xml_writer.write(xml_unit_parts(escaper, unidade))
+    if impressoes is not None:
+        impressoes.append(unit_fingerprint(unidade))
+
 
-# 1. Selecionar e validar elementos
+# MAIN CODE
+# Os arquivos auxiliares ficam ao lado do modelo (do central, se colaborativo), valendo para todas as estações
+value_store = ElementValueStore(doc, model_data_path(doc, ".plannix-cache.json"))
+cache = ParameterCache(doc, value_store)
+escaper = XmlEscaper()
+assembly_index = AssemblyIndex(doc, script.get_document_data_file("assembly_index", "json"))
+
+# 1. Selecionar e validar elementos (sem seleção, oferece exportar o modelo inteiro)
+selected_ids = list(uidoc.Selection.GetElementIds())
+modelo_inteiro = not selected_ids and forms.alert(
+    "Nenhum elemento foi selecionado no modelo.\nDeseja exportar todas as peças do modelo?",
+    yes=True,
+    no=True
+)
 selected_elements = []
-for elem_id in uidoc.Selection.GetElementIds():
-    elem = uidoc.Document.GetElement(elem_id)
-    main_element = get_main_element(elem)
-    if main_element:
-        selected_elements.append(main_element)
+prefiltro = None
+if modelo_inteiro:
+    # Só as peças com os obrigatórios preenchidos saem do coletor; as demais são resumidas
+    try:
+        prefiltro = required_parameters_filter(doc)
+    except ParametroAusenteError as e:
+        print(
+            "\nO parâmetro obrigatório '{}' não existe no modelo.\n"
+            "O arquivo XML não foi gerado.".format(e)
+        )
+        sys.exit(0)
+    selected_elements = collect_model_pieces(doc, assembly_index, prefiltro)
+    if prefiltro is not None:
+        incompletas, nomes_incompletas = incomplete_model_pieces(doc, prefiltro)
+        if incompletas:
+            print(
+                "{} elemento(s) das categorias de peças não têm todos os parâmetros "
+                "obrigatórios preenchidos e não foram exportados.".format(incompletas)
+            )
+        if nomes_incompletas:
+            print("Peças com nome entre eles: {}".format(", ".join(nomes_incompletas)))
+else:
+    for elem_id in selected_ids:
+        elem = uidoc.Document.GetElement(elem_id)
+        main_element = get_main_element(assembly_index, elem)
+        if main_element:
+            selected_elements.append(main_element)
+assembly_index.save()
 unique_dict = {}
 for element in selected_elements:
     unique_dict[element.UniqueId] = element
 selected_elements = list(unique_dict.values())
+if not selected_elements and modelo_inteiro:
+    print("Nenhuma peça do modelo está com todos os parâmetros obrigatórios preenchidos.")
+    sys.exit(0)
 if not selected_elements:
     print("Nenhum elemento foi selecionado no modelo. Favor selecionar e tentar novamente.")
     sys.exit(1)
 else:
     pass
+# No modo modelo inteiro a seleção (vazia) não é restaurada ao fim da impressão dos PDFs
+selecao_restaurar = None if modelo_inteiro else selected_elements
 valid_elements = reject_invalid(selected_elements)
-filtered_elements = filter_elements(valid_elements)
+filtered_elements = filter_elements(cache, valid_elements, prefiltro)
 # group_elements(selected_elements)
 if not filtered_elements:
     print(
@@ -961,57 +279,85 @@ while os.path.exists(xml_file_path):
     xml_file_path = os.path.join(directory_path, output_string)
     counter += 1
 
-# 4. Estrutura base do XML
-xml_header = '<?xml version="1.0" encoding="ISO-8859-1" ?>\n'
-xml_detalhamento_open = ('<DETALHAMENTOPLANNIX obra="' + OBRA + '" name="' + NAME + '" projetista="' + PROJETISTA +
-                         '">\n')
-xml_detalhamento_close = '</DETALHAMENTOPLANNIX>'
-
-# 5. Exportar XML
-xml_content = []
-xml_content.append(xml_header)
-xml_content.append(xml_detalhamento_open)
-grupos = group_elements(filtered_elements)
+# 4. Agrupar peças
+grupos = group_elements(cache, filtered_elements)
+sheet_index = SheetIndex(doc) if (gerar_pdfs or incluir_nomes_pdf) else None
 grupos_ordenados = sorted(
     grupos.values(),
-    key=lambda g: natural_key(get_nome_peca(g["elemento_base"]))
+    key=lambda g: natural_key(get_nome_peca(cache, g["elemento_base"]))
 )
-if gerar_pdfs:
-    with forms.ProgressBar(title='Gerando PDFs das viewsheets...', cancellable=False) as pb:
-        total = len(grupos_ordenados)
-        for i, grupo in enumerate(grupos_ordenados):
-            elemento = grupo["elemento_base"]
-            nome_peca = get_nome_peca(elemento)
-            is_last = (i == total - 1)
-            pdf_files = export_sheets_pdf(
-                nome_peca,
-                directory_path,
-                sobrescrever_pdfs,
-                selected_elements,
-                is_last
-            )
-            xml_unit = xml_unit_build(elemento, grupo, pdf_files)
-            xml_content.append(xml_unit)
-            pb.update_progress(i + 1, total)
-else:
-    for grupo in grupos_ordenados:
-        elemento = grupo["elemento_base"]
-        nome_peca = get_nome_peca(elemento)
-        pdf_files = get_pdf_names(nome_peca, directory_path) if incluir_nomes_pdf else None
-        xml_unit = xml_unit_build(elemento, grupo, pdf_files)
-        xml_content.append(xml_unit)
-xml_content.append(xml_detalhamento_close)
 
-# 6. Gravar arquivo XML
-with open(xml_file_path, "w") as xml_file:
-    xml_file.write("".join(xml_content))
+# 5. Separar as peças alteradas desde a última exportação
+fingerprints = ExportFingerprints(model_data_path(doc, ".plannix-fingerprints.json"))
+impressoes = []
+pecas_inalteradas = 0
+# Sem a triagem, as impressões são calculadas no passo 6 a partir do conteúdo gravado no XML
+impressoes_escrita = None if somente_alteradas else impressoes
+if somente_alteradas:
+    impressoes = [piece_fingerprint(cache, grupo) for grupo in grupos_ordenados]
+    value_store.save()
+    alterados = [
+        (grupo, impressao) for grupo, impressao in zip(grupos_ordenados, impressoes)
+        if fingerprints.changed(grupo, impressao)
+    ]
+    pecas_inalteradas = len(grupos_ordenados) - len(alterados)
+    if not alterados:
+        print(
+            "\nNenhuma das peças selecionadas foi alterada desde a última exportação.\n"
+            "O arquivo XML não foi gerado."
+        )
+        sys.exit(0)
+    grupos_ordenados = [grupo for grupo, _ in alterados]
+    impressoes = [impressao for _, impressao in alterados]
+    ids_alterados = set(uid for grupo in grupos_ordenados for uid in grupo["ids"])
+    filtered_elements = [e for e in filtered_elements if e.UniqueId in ids_alterados]
+
+# 6. Exportar XML (cada peça é gravada no arquivo assim que é gerada)
+with PlannixXmlWriter(xml_file_path, OBRA, NAME, PROJETISTA) as xml_writer:
+    if gerar_pdfs and pdfs_em_lote_unico:
+        nomes_pecas = [get_nome_peca(cache, grupo["elemento_base"]) for grupo in grupos_ordenados]
+        pdfs_por_peca = export_all_sheets_pdf(nomes_pecas, directory_path, sobrescrever_pdfs, selecao_restaurar)
+        for nome_peca, grupo in zip(nomes_pecas, grupos_ordenados):
+            escrever_peca(xml_writer, grupo["elemento_base"], grupo, pdfs_por_peca.get(nome_peca), impressoes_escrita)
+    elif gerar_pdfs:
+        with forms.ProgressBar(title='Gerando PDFs das viewsheets...', cancellable=False) as pb:
+            total = len(grupos_ordenados)
+            for i, grupo in enumerate(grupos_ordenados):
+                elemento = grupo["elemento_base"]
+                nome_peca = get_nome_peca(cache, elemento)
+                is_last = (i == total - 1)
+                pdf_files = export_sheets_pdf(
+                    nome_peca,
+                    directory_path,
+                    sobrescrever_pdfs,
+                    selecao_restaurar,
+                    is_last
+                )
+                escrever_peca(xml_writer, elemento, grupo, pdf_files, impressoes_escrita)
+                pb.update_progress(i + 1, total)
+    else:
+        for grupo in grupos_ordenados:
+            elemento = grupo["elemento_base"]
+            nome_peca = get_nome_peca(cache, elemento)
+            pdf_files = get_pdf_names(nome_peca, directory_path) if incluir_nomes_pdf else None
+            escrever_peca(xml_writer, elemento, grupo, pdf_files, impressoes_escrita)
 
 # 7. Atualizar parâmetros de exportação nos elementos
 atualizar_parametros_exportacao(filtered_elements)
+value_store.refresh([e.Id for e in filtered_elements])
+value_store.save()
+for grupo, impressao in zip(grupos_ordenados, impressoes):
+    fingerprints.update(grupo, impressao)
+fingerprints.save()
 
 if output_space == 1:
     print('\nElementos válidos exportados com sucesso para o documento "{}" dentro do diretório "{}".'
           .format(output_string, directory_path))
 else:
     print('Elementos válidos exportados com sucesso para o documento "{}" dentro do diretório "{}".'
-          .format(output_string, directory_path))
\ No newline at end of file
+          .format(output_string, directory_path))
+if pecas_inalteradas:
+    print("Peças sem alteração desde a última exportação (não exportadas): {}".format(pecas_inalteradas))
+for aviso in escaper.report():
+    print(aviso)
+print(cache.report())
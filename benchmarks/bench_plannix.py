@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da integração Plannix sobre modelos pré-moldados sintéticos.
+
+Roda em CPython, fora do Revit, usando o substituto `fakerevit` desta pasta
+(ativado pela variável PLANNIX_FAKE_REVIT, definida aqui).
+Gera um modelo por tamanho pedido, cronometra as etapas principais e grava os
+resultados em JSON para comparação entre versões.
+
+Uso:
+    python benchmarks/bench_plannix.py --sizes 1000,10000,50000 --output bench.json
+    python benchmarks/bench_plannix.py --sizes 3000 --assembly-share 0.8 --rebars 40
+
+Etapas medidas:
+    collect_model     coleta das peças do modelo inteiro com o filtro de parâmetros obrigatórios
+                      e resumo das recusadas
+    group_elements    agrupamento das peças (cache de parâmetros frio)
+    xml_unit_build    geração e gravação em fluxo de todas as PECA
+    export_warm_store group_elements + xml_unit_build com o cache em disco já gravado,
+                      depois de editar --changed-status peças
+    export_fingerprint
+                      impressões de todas as peças e comparação com a exportação anterior
+    sheet_lookup      índice de folhas + nomes dos PDFs de cada peça
+    import_parse      leitura do XML do Plannix
+    import_apply      gravação de código, status e data nas peças
+    import_apply_diff importação repetida em modo diferencial (nada muda)
+    apply_colors      coloração por status da vista
+    apply_colors_incremental
+                      recoloração após mudar o status de --changed-status peças
+    apply_colors_views
+                      coloração por status de --views vistas em uma transação
+    apply_filter_colors
+                      coloração por status com filtros de vista
+"""
+
+# IMPORTS
+import argparse
+import copy
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, os.pardir, "lib"))
+sys.path.insert(0, BENCH_DIR)
+os.environ.setdefault("PLANNIX_FAKE_REVIT", "1")
+
+from Snippets import _revitapi
+from Snippets._revitapi import BuiltInCategory, Document, Parameter
+from Snippets._assemblies import AssemblyIndex
+from Snippets._cache import ElementValueStore, ParameterCache
+from Snippets._colors import MODO_STATUS, ColorSnapshot, apply_colors_generic
+from Snippets._export import (
+    ALTURA,
+    CLASSECONCRETO,
+    COMPRIMENTO,
+    GRUPO,
+    INFOADICIONAL,
+    LARGURA,
+    MARCA,
+    NOMEPECA,
+    SECAO,
+    TIPOPRODUTO,
+    VOLUMEUNITARIO,
+    collect_model_pieces,
+    filter_elements,
+    get_nome_peca,
+    group_elements,
+    incomplete_model_pieces,
+    required_parameters_filter,
+    xml_unit_build,
+)
+from Snippets._fingerprint import ExportFingerprints, piece_fingerprint
+from Snippets._import import import_pecas, read_pecas
+from Snippets._sheets import PARAM_NOME, PARAM_NUMERO, PARAM_TEMA, SheetIndex
+from Snippets._status import PARAM_EXPORTADO, PARAM_REVISOES, PARAM_STATUS, STATUS_MAP
+from Snippets._utils import natural_key
+from Snippets._viewfilters import apply_filter_colors
+from Snippets._xmlwriter import PlannixXmlWriter, XmlEscaper
+
+CATEGORIAS = [
+    BuiltInCategory.OST_StructuralColumns,
+    BuiltInCategory.OST_StructuralFraming,
+    BuiltInCategory.OST_StructuralFoundation,
+    BuiltInCategory.OST_Floors,
+    BuiltInCategory.OST_Walls,
+]
+FT3_POR_M3 = 1.0 / 0.028316846592
+
+
+# MODELO SINTÉTICO
+def build_model(pieces, assembly_share, rebars, sheets_per_piece, pieces_per_group, seed):
+    """Cria um documento com `pieces` peças principais e retorna (doc, peças, vista)."""
+    rng = random.Random(seed)
+    doc = Document(os.path.join(tempfile.gettempdir(), "plannix_bench.rvt"))
+    doc.new_fill_pattern(is_solid_fill=False, name="Hachura")
+    doc.new_fill_pattern(is_solid_fill=True, name="Sólido")
+    view = doc.new_view("3D Plannix")
+    for param_name in (
+        PARAM_STATUS, PARAM_EXPORTADO, PARAM_REVISOES,
+        TIPOPRODUTO, GRUPO, SECAO, INFOADICIONAL, COMPRIMENTO, ALTURA,
+    ):
+        doc.new_parameter_element(param_name)
+    status_revit = list(STATUS_MAP.values())
+
+    tipos_concreto = [
+        doc.new_type(params={CLASSECONCRETO: "C{}".format(fck)}, name="C{}".format(fck))
+        for fck in (30, 35, 40, 50)
+    ]
+    tipos_aco = [
+        doc.new_type(
+            params={
+                "Material": "CA50" if bitola > 5 else "CA60",
+                "Nome do tipo": "Ø{}".format(bitola),
+                "Fator de Peso": 0.00617 * bitola * bitola * 0.3048,
+            },
+            name="Ø{}".format(bitola),
+        )
+        for bitola in (5, 6.3, 8, 10, 12.5, 16, 20)
+    ]
+
+    pecas = []
+    n_grupos = max(1, pieces // max(1, pieces_per_group))
+    for i in range(pieces):
+        g = i % n_grupos
+        categoria = CATEGORIAS[g % len(CATEGORIAS)]
+        comprimento = 2.0 + (g % 40) * 0.25
+        params = {
+            NOMEPECA: "P{}".format(g),
+            MARCA: "",
+            TIPOPRODUTO: ("PILAR", "VIGA", "SAPATA", "LAJE", "PAINEL")[g % 5],
+            GRUPO: "PRÉ-MOLDADO",
+            SECAO: "{}x{}".format(20 + 5 * (g % 6), 40 + 10 * (g % 5)),
+            INFOADICIONAL: "Lote {}".format(g % 12),
+            COMPRIMENTO: Parameter(COMPRIMENTO, comprimento, display="{:.2f}".format(comprimento)),
+            ALTURA: "{}".format(40 + 10 * (g % 5)),
+            LARGURA: "{}".format(20 + 5 * (g % 6)),
+            VOLUMEUNITARIO: 0.2 * comprimento * FT3_POR_M3,
+            PARAM_STATUS: rng.choice(status_revit),
+            "16. CÓDIGO DE CONTROLE": "",
+            "19. DATA DO STATUS": "",
+            PARAM_EXPORTADO: 1,
+            PARAM_REVISOES: rng.randint(0, 6),
+        }
+        tipo = tipos_concreto[g % len(tipos_concreto)]
+        peca = doc.new_element(categoria, params, tipo)
+        pecas.append(peca)
+        if rng.random() < assembly_share:
+            membros = [peca]
+            for n in range(rebars):
+                membros.append(doc.new_element(
+                    BuiltInCategory.OST_Rebar,
+                    {
+                        "Número do vergalhão": n % 12 + 1,
+                        "Quantidade": rng.randint(1, 12),
+                        "Comprimento total da barra": rng.uniform(1.0, 40.0),
+                    },
+                    tipos_aco[n % len(tipos_aco)],
+                ))
+            doc.new_assembly(membros)
+
+    for g in range(n_grupos):
+        for n in range(sheets_per_piece):
+            doc.new_sheet({
+                PARAM_TEMA: "P{}".format(g),
+                PARAM_NUMERO: "{}-{}".format(g, n + 1),
+                PARAM_NOME: "Folha {}".format(n + 1),
+            })
+    return doc, pecas, view
+
+
+def write_import_xml(path, pecas, xml_pieces, seed):
+    rng = random.Random(seed)
+    status_plannix = list(STATUS_MAP.keys())
+    with io.open(path, "w", encoding="ISO-8859-1") as f:
+        f.write(u'<?xml version="1.0" encoding="ISO-8859-1" ?>\n<PLANNIX>\n')
+        for i in range(xml_pieces):
+            peca = pecas[i % len(pecas)]
+            f.write(
+                u"\t<PECA>\n"
+                u"\t\t<NOMEPECA>P{}</NOMEPECA>\n"
+                u"\t\t<ID>{}</ID>\n"
+                u"\t\t<CODCONTROLE>{}</CODCONTROLE>\n"
+                u"\t\t<STATUS>{}</STATUS>\n"
+                u"\t\t<DATA>2026-01-{:02d}</DATA>\n"
+                u"\t</PECA>\n".format(i, peca.UniqueId, 10000 + i, rng.choice(status_plannix), i % 28 + 1)
+            )
+        f.write(u"</PLANNIX>")
+
+
+# CRONOMETRAGEM
+def timed(func, repeat):
+    """Executa `func` `repeat` vezes e retorna (melhor, média, último resultado)."""
+    tempos = []
+    resultado = None
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        resultado = func()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), sum(tempos) / len(tempos), resultado
+
+
+def run_size(pieces, args, workdir):
+    doc, pecas, view = build_model(
+        pieces, args.assembly_share, args.rebars, args.sheets_per_piece, args.pieces_per_group, args.seed
+    )
+    timings = {}
+    extras = {}
+
+    def registrar(nome, func):
+        melhor, media, resultado = timed(func, args.repeat)
+        timings[nome] = {"best_s": round(melhor, 6), "mean_s": round(media, 6)}
+        return resultado
+
+    estado = {}
+
+    def coletar_modelo():
+        filtro = required_parameters_filter(doc)
+        incomplete_model_pieces(doc, filtro)
+        return collect_model_pieces(doc, AssemblyIndex(doc), filtro)
+
+    extras["model_pieces"] = len(registrar("collect_model", coletar_modelo))
+
+    def agrupar():
+        cache = ParameterCache(doc)
+        validos = filter_elements(cache, pecas)
+        estado["cache"] = cache
+        return group_elements(cache, validos)
+
+    grupos = registrar("group_elements", agrupar)
+    cache = estado["cache"]
+    grupos_ordenados = sorted(grupos.values(), key=lambda g: natural_key(get_nome_peca(cache, g["elemento_base"])))
+    xml_export = os.path.join(workdir, "export.xml")
+
+    def exportar():
+        escaper = XmlEscaper()
+        with PlannixXmlWriter(xml_export, "Obra", "Serpa", "Projetista") as writer:
+            for grupo in grupos_ordenados:
+                writer.write(xml_unit_build(cache, escaper, grupo["elemento_base"], grupo))
+
+    registrar("xml_unit_build", exportar)
+    extras["groups"] = len(grupos_ordenados)
+    extras["export_xml_bytes"] = os.path.getsize(xml_export)
+    extras["cache_hits"] = cache.hits
+    extras["cache_misses"] = cache.misses
+
+    store_path = os.path.join(workdir, "modelo.plannix-cache.json")
+    xml_store = os.path.join(workdir, "export_store.xml")
+    editadas = random.Random(args.seed).sample(pecas, min(args.changed_status, len(pecas)))
+
+    def exportar_com_store():
+        store = ElementValueStore(doc, store_path)
+        cache_store = ParameterCache(doc, store)
+        grupos_store = group_elements(cache_store, filter_elements(cache_store, pecas)).values()
+        escaper = XmlEscaper()
+        with PlannixXmlWriter(xml_store, "Obra", "Serpa", "Projetista") as writer:
+            for grupo in sorted(grupos_store, key=lambda g: natural_key(get_nome_peca(cache_store, g["elemento_base"]))):
+                writer.write(xml_unit_build(cache_store, escaper, grupo["elemento_base"], grupo))
+        store.save()
+        return store
+
+    def exportar_apos_edicao():
+        for peca in editadas:
+            peca.touch()
+        return exportar_com_store()
+
+    exportar_com_store()
+    store = registrar("export_warm_store", exportar_apos_edicao)
+    extras["store_reused"] = store.reused
+    extras["store_invalidated"] = store.invalidated
+    with io.open(xml_export, "rb") as a, io.open(xml_store, "rb") as b:
+        extras["store_xml_identical"] = a.read() == b.read()
+
+    fingerprints_path = os.path.join(workdir, "export_fingerprints.json")
+    anteriores = ExportFingerprints(fingerprints_path)
+    for grupo in grupos_ordenados:
+        anteriores.update(grupo, piece_fingerprint(cache, grupo))
+    anteriores.save()
+
+    def comparar_impressoes():
+        gravadas = ExportFingerprints(fingerprints_path)
+        return sum(1 for g in grupos_ordenados if gravadas.changed(g, piece_fingerprint(cache, g)))
+
+    extras["changed_groups"] = registrar("export_fingerprint", comparar_impressoes)
+
+    nomes = [get_nome_peca(cache, g["elemento_base"]) for g in grupos_ordenados]
+
+    def folhas():
+        index = SheetIndex(doc)
+        return sum(len(index.pdf_names(nome)) for nome in nomes)
+
+    extras["pdf_names"] = registrar("sheet_lookup", folhas)
+
+    xml_import = os.path.join(workdir, "import.xml")
+    write_import_xml(xml_import, pecas, args.xml_pieces or pieces, args.seed)
+    extras["import_xml_bytes"] = os.path.getsize(xml_import)
+    lidas = registrar("import_parse", lambda: read_pecas(xml_import))
+    contagem = registrar("import_apply", lambda: import_pecas(doc, lidas))
+    extras["import_ok"] = contagem["atualizadas"]
+    extras["import_errors"] = contagem["erros"] + contagem["nao_encontradas"]
+    contagem = registrar("import_apply_diff", lambda: import_pecas(doc, lidas, only_changed=True))
+    extras["import_unchanged"] = contagem["inalteradas"]
+
+    contagem = registrar(
+        "apply_colors",
+        lambda: apply_colors_generic(doc, [view], MODO_STATUS, "Benchmark")
+    )
+    extras["colored"] = contagem["aplicadas"]
+    snapshot = ColorSnapshot(None)
+    apply_colors_generic(doc, [view], MODO_STATUS, "Benchmark", snapshot)
+
+    rng = random.Random(args.seed)
+    for peca in rng.sample(pecas, min(args.changed_status, len(pecas))):
+        peca.set_parameter(PARAM_STATUS, rng.choice(list(STATUS_MAP.values())))
+    copias = [copy.deepcopy(snapshot) for _ in range(args.repeat)]
+    contagem = registrar(
+        "apply_colors_incremental",
+        lambda: apply_colors_generic(doc, [view], MODO_STATUS, "Benchmark", copias.pop())
+    )
+    extras["recolored"] = contagem["aplicadas"]
+    vistas = [view] + [doc.new_view("3D Plannix {}".format(n)) for n in range(1, args.views)]
+    contagem = registrar(
+        "apply_colors_views",
+        lambda: apply_colors_generic(doc, vistas, MODO_STATUS, "Benchmark")
+    )
+    extras["colored_views"] = len(vistas)
+    extras["view_filters"] = registrar(
+        "apply_filter_colors",
+        lambda: apply_filter_colors(doc, [view], MODO_STATUS, "Benchmark")
+    )["filtros"]
+    return {
+        "params": {
+            "pieces": pieces,
+            "assembly_share": args.assembly_share,
+            "rebars_per_assembly": args.rebars,
+            "sheets_per_piece": args.sheets_per_piece,
+            "pieces_per_group": args.pieces_per_group,
+            "xml_pieces": args.xml_pieces or pieces,
+        },
+        "model": {"elements": len(doc.elements())},
+        "timings": timings,
+        "counts": extras,
+    }
+
+
+# MAIN
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="1000,5000,10000,50000",
+                        help="Quantidades de peças separadas por vírgula (padrão: %(default)s).")
+    parser.add_argument("--assembly-share", type=float, default=0.5,
+                        help="Fração das peças dentro de montagens (padrão: %(default)s).")
+    parser.add_argument("--rebars", type=int, default=20,
+                        help="Vergalhões por montagem (padrão: %(default)s).")
+    parser.add_argument("--sheets-per-piece", type=int, default=2,
+                        help="Folhas por peça (padrão: %(default)s).")
+    parser.add_argument("--pieces-per-group", type=int, default=4,
+                        help="Peças idênticas por grupo de exportação (padrão: %(default)s).")
+    parser.add_argument("--xml-pieces", type=int, default=0,
+                        help="PECAs no XML de importação; 0 usa a quantidade de peças.")
+    parser.add_argument("--changed-status", type=int, default=50,
+                        help="Peças com status alterado antes da recoloração (padrão: %(default)s).")
+    parser.add_argument("--views", type=int, default=10,
+                        help="Vistas coloridas em lote (padrão: %(default)s).")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Repetições de cada etapa; vale o melhor tempo (padrão: %(default)s).")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench_results.json",
+                        help="Arquivo JSON de saída (padrão: %(default)s).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not _revitapi.HEADLESS:
+        raise SystemExit("O benchmark deve ser executado fora do Revit.")
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = tempfile.mkdtemp(prefix="plannix_bench_")
+    runs = []
+    try:
+        for pieces in sizes:
+            resultado = run_size(pieces, args, workdir)
+            runs.append(resultado)
+            print("{:>7} peças: {}".format(pieces, ", ".join(
+                "{}={:.3f}s".format(nome, t["best_s"]) for nome, t in sorted(resultado["timings"].items())
+            )))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    relatorio = {
+        "generated_at": datetime.datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "runs": runs,
+    }
+    with io.open(args.output, "w", encoding="utf-8") as f:
+        f.write(json.dumps(relatorio, indent=2, sort_keys=True, ensure_ascii=False))
+    print("Resultados gravados em {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,830 @@
+# -*- coding: utf-8 -*-
+"""Substituto em memória da parte da API do Revit usada pela lógica do Plannix.
+
+Permite executar e cronometrar agrupamento, tabela de aço e geração do XML em
+CPython, fora do Revit. Só reproduz o comportamento que os módulos de
+`Snippets` realmente usam; não é uma emulação completa da API. É carregado
+por `Snippets._revitapi` quando a variável PLANNIX_FAKE_REVIT está definida e
+esta pasta está no sys.path, como faz `bench_plannix.py`.
+
+Exemplo:
+    doc = Document("C:/obra/modelo.rvt")
+    tipo = doc.new_type(params={"12. FCK": "40 MPa"})
+    viga = doc.new_element(BuiltInCategory.OST_StructuralFraming, {"Modelo": "V1"}, tipo)
+"""
+
+# IMPORTS
+import itertools
+import os
+import re
+import uuid
+
+
+# EXCEPTIONS
+class InvalidOperationException(Exception):
+    pass
+
+
+# ENUMS
+class BuiltInCategory(object):
+    OST_Walls                = -2000011
+    OST_Floors               = -2000032
+    OST_Assemblies           = -2000267
+    OST_Sheets               = -2003100
+    OST_StructuralFoundation = -2001300
+    OST_StructuralFraming    = -2001320
+    OST_StructuralColumns    = -2001330
+    OST_Rebar                = -2009000
+    OST_FabricReinforcement  = -2009009
+
+
+class BuiltInParameter(object):
+    SHEET_NAME           = -1007400
+    SHEET_NUMBER         = -1007401
+    ALL_MODEL_MODEL      = -1002051
+    HOST_VOLUME_COMPUTED = -1012806
+    VIS_GRAPHICS_FILTERS = -1006967
+
+
+# Nome (em português) dos parâmetros nativos usados pelas regras de filtro
+_nomes_nativos = {
+    BuiltInParameter.ALL_MODEL_MODEL     : "Modelo",
+    BuiltInParameter.HOST_VOLUME_COMPUTED: "Volume",
+    BuiltInParameter.SHEET_NAME          : "Nome da folha",
+    BuiltInParameter.SHEET_NUMBER        : "Número da folha",
+}
+
+
+class StorageType(object):
+    None_     = 0
+    Integer   = 1
+    Double    = 2
+    String    = 3
+    ElementId = 4
+
+
+class UnitTypeId(object):
+    Meters            = "autodesk.unit.unit:meters"
+    Centimeters       = "autodesk.unit.unit:centimeters"
+    Kilograms         = "autodesk.unit.unit:kilograms"
+    KilogramsPerMeter = "autodesk.unit.unit:kilogramsPerMeter"
+    CubicMeters       = "autodesk.unit.unit:cubicMeters"
+
+
+class UnitUtils(object):
+    # Unidades internas do Revit: pé, kg, kg/pé, pé³
+    _FATORES = {
+        UnitTypeId.Meters: 0.3048,
+        UnitTypeId.Centimeters: 30.48,
+        UnitTypeId.Kilograms: 1.0,
+        UnitTypeId.KilogramsPerMeter: 1.0 / 0.3048,
+        UnitTypeId.CubicMeters: 0.028316846592,
+    }
+
+    @staticmethod
+    def ConvertFromInternalUnits(value, unit):
+        return value * UnitUtils._FATORES[unit]
+
+    @staticmethod
+    def ConvertToInternalUnits(value, unit):
+        return value / UnitUtils._FATORES[unit]
+
+
+# COLLECTIONS
+class _TypedList(list):
+
+    def Add(self, item):
+        self.append(item)
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class _ListFactory(object):
+    """Imita `System.Collections.Generic.List[T]`."""
+
+    def __getitem__(self, item_type):
+        return _TypedList
+
+
+List = _ListFactory()
+
+
+# CORE
+class ElementId(object):
+    __slots__ = ("IntegerValue",)
+
+    def __init__(self, value):
+        self.IntegerValue = int(value)
+
+    @property
+    def Value(self):
+        return self.IntegerValue
+
+    def __eq__(self, other):
+        return isinstance(other, ElementId) and other.IntegerValue == self.IntegerValue
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.IntegerValue)
+
+    def __int__(self):
+        return self.IntegerValue
+
+    def __str__(self):
+        return str(self.IntegerValue)
+
+    __repr__ = __str__
+
+
+ElementId.InvalidElementId = ElementId(-1)
+
+
+class Category(object):
+
+    def __init__(self, built_in_category):
+        self.Id = ElementId(built_in_category)
+        self.BuiltInCategory = built_in_category
+
+
+class Definition(object):
+
+    def __init__(self, name):
+        self.Name = name
+
+
+class Parameter(object):
+    """Parâmetro com valor fixo. `display` é o texto de AsValueString, quando diferente do valor."""
+
+    _ids = itertools.count(900000)
+    _ids_por_nome = {}
+
+    def __init__(self, name, value=None, storage_type=None, display=None, read_only=False):
+        if storage_type is None:
+            if isinstance(value, bool) or isinstance(value, int):
+                storage_type = StorageType.Integer
+            elif isinstance(value, float):
+                storage_type = StorageType.Double
+            elif isinstance(value, ElementId):
+                storage_type = StorageType.ElementId
+            else:
+                storage_type = StorageType.String
+        # Mesmo nome, mesmo id, como os parâmetros de projeto e compartilhados
+        if name not in Parameter._ids_por_nome:
+            Parameter._ids_por_nome[name] = next(Parameter._ids)
+        self.Id = ElementId(Parameter._ids_por_nome[name])
+        self.Definition = Definition(name)
+        self.StorageType = storage_type
+        self.IsReadOnly = read_only
+        self._value = value
+        self._display = display
+        self._owner = None
+
+    @property
+    def HasValue(self):
+        return self._value is not None and self._value != ""
+
+    def AsString(self):
+        if self.StorageType != StorageType.String:
+            return None
+        return self._value
+
+    def AsValueString(self):
+        if self._display is not None:
+            return self._display
+        if self._value is None:
+            return None
+        if self.StorageType == StorageType.Double:
+            return "{:.2f}".format(self._value)
+        return str(self._value)
+
+    def AsDouble(self):
+        if self.StorageType != StorageType.Double:
+            raise TypeError("O parâmetro '{}' não é Double.".format(self.Definition.Name))
+        return self._value
+
+    def AsInteger(self):
+        if self.StorageType != StorageType.Integer:
+            raise TypeError("O parâmetro '{}' não é Integer.".format(self.Definition.Name))
+        return int(self._value or 0)
+
+    def AsElementId(self):
+        return self._value if self.StorageType == StorageType.ElementId else ElementId.InvalidElementId
+
+    def Set(self, value):
+        if self.IsReadOnly:
+            raise Exception("O parâmetro '{}' é somente leitura.".format(self.Definition.Name))
+        self._value = value
+        self._display = None
+        if self._owner is not None:
+            self._owner.touch()
+        return True
+
+
+class Element(object):
+    """Elemento com parâmetros por nome. `VersionGuid` muda a cada `Parameter.Set`."""
+
+    _versoes = itertools.count(1)
+
+    def __init__(self, category=None, params=None, type_id=None, name=""):
+        self._versao = next(Element._versoes)
+        self.Id = ElementId.InvalidElementId
+        self.UniqueId = ""
+        self.Document = None
+        self.Name = name
+        self.Category = Category(category) if category is not None else None
+        self.AssemblyInstanceId = ElementId.InvalidElementId
+        self.IsValidObject = True
+        self._type_id = type_id or ElementId.InvalidElementId
+        self._params = {}
+        for param_name, value in (params or {}).items():
+            self.set_parameter(param_name, value)
+
+    def set_parameter(self, param_name, value):
+        if not isinstance(value, Parameter):
+            value = Parameter(param_name, value)
+        value._owner = self
+        self._params[param_name] = value
+        return value
+
+    def touch(self):
+        self._versao = next(Element._versoes)
+
+    @property
+    def VersionGuid(self):
+        return uuid.UUID(int=self._versao)
+
+    @property
+    def Parameters(self):
+        return list(self._params.values())
+
+    def LookupParameter(self, param_name):
+        return self._params.get(param_name)
+
+    def GetTypeId(self):
+        return self._type_id
+
+
+class ElementType(Element):
+    pass
+
+
+class AssemblyInstance(Element):
+
+    def __init__(self, params=None, name=""):
+        Element.__init__(self, BuiltInCategory.OST_Assemblies, params, name=name)
+        self._member_ids = []
+
+    def GetMemberIds(self):
+        return _TypedList(self._member_ids)
+
+
+class View(Element):
+
+    def __init__(self, category=None, params=None, type_id=None, name=""):
+        Element.__init__(self, category, params, type_id, name)
+        self.IsTemplate = False
+        self.ViewTemplateId = ElementId.InvalidElementId
+        self._overrides = {}
+        self._filters = []
+        self._filter_overrides = {}
+        self._non_controlled = []
+
+    def AreGraphicsOverridesAllowed(self):
+        return True
+
+    def GetNonControlledTemplateParameterIds(self):
+        return _TypedList(self._non_controlled)
+
+    def _check_filters_editable(self):
+        if self.ViewTemplateId == ElementId.InvalidElementId:
+            return
+        template = self.Document.GetElement(self.ViewTemplateId)
+        if ElementId(BuiltInParameter.VIS_GRAPHICS_FILTERS) not in template.GetNonControlledTemplateParameterIds():
+            raise InvalidOperationException("Os filtros da vista são controlados pelo modelo de vista.")
+
+    def SetElementOverrides(self, element_id, overrides):
+        if overrides.is_default():
+            self._overrides.pop(element_id.IntegerValue, None)
+        else:
+            self._overrides[element_id.IntegerValue] = overrides
+
+    def GetElementOverrides(self, element_id):
+        return self._overrides.get(element_id.IntegerValue) or OverrideGraphicSettings()
+
+    def overridden_ids(self):
+        return [ElementId(i) for i in self._overrides]
+
+    def GetFilters(self):
+        return _TypedList(ElementId(i) for i in self._filters)
+
+    def IsFilterApplied(self, filter_id):
+        return filter_id.IntegerValue in self._filters
+
+    def AddFilter(self, filter_id):
+        self._check_filters_editable()
+        if filter_id.IntegerValue not in self._filters:
+            self._filters.append(filter_id.IntegerValue)
+
+    def RemoveFilter(self, filter_id):
+        self._check_filters_editable()
+        self._filters.remove(filter_id.IntegerValue)
+        self._filter_overrides.pop(filter_id.IntegerValue, None)
+
+    def SetFilterOverrides(self, filter_id, overrides):
+        self._check_filters_editable()
+        self._filter_overrides[filter_id.IntegerValue] = overrides
+
+    def GetFilterOverrides(self, filter_id):
+        return self._filter_overrides.get(filter_id.IntegerValue) or OverrideGraphicSettings()
+
+    def SetFilterVisibility(self, filter_id, visible):
+        pass
+
+
+class View3D(View):
+    pass
+
+
+class ViewSheet(View):
+
+    def __init__(self, params=None, name=""):
+        View.__init__(self, BuiltInCategory.OST_Sheets, params, name=name)
+        self._placed_view_ids = []
+
+    def AreGraphicsOverridesAllowed(self):
+        return False
+
+    def place(self, view):
+        self._placed_view_ids.append(view.Id)
+
+    def GetAllPlacedViews(self):
+        return set(self._placed_view_ids)
+
+
+# GRAPHICS
+class Color(object):
+    __slots__ = ("Red", "Green", "Blue")
+
+    def __init__(self, red, green, blue):
+        self.Red = red
+        self.Green = green
+        self.Blue = blue
+
+    @property
+    def IsValid(self):
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, Color) and (self.Red, self.Green, self.Blue) == (other.Red, other.Green, other.Blue)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+class FillPattern(object):
+
+    def __init__(self, is_solid_fill):
+        self.IsSolidFill = is_solid_fill
+
+
+class FillPatternElement(Element):
+
+    def __init__(self, is_solid_fill=True, name=""):
+        Element.__init__(self, name=name)
+        self._pattern = FillPattern(is_solid_fill)
+
+    def GetFillPattern(self):
+        return self._pattern
+
+
+class OverrideGraphicSettings(object):
+
+    def __init__(self):
+        self.SurfaceForegroundPatternColor = None
+        self.SurfaceForegroundPatternId = ElementId.InvalidElementId
+        self.Transparency = 0
+
+    def SetSurfaceForegroundPatternColor(self, color):
+        self.SurfaceForegroundPatternColor = color
+        return self
+
+    def SetSurfaceForegroundPatternId(self, pattern_id):
+        self.SurfaceForegroundPatternId = pattern_id
+        return self
+
+    def SetSurfaceTransparency(self, transparency):
+        self.Transparency = transparency
+        return self
+
+    def is_default(self):
+        return (
+            self.SurfaceForegroundPatternColor is None
+            and self.SurfaceForegroundPatternId == ElementId.InvalidElementId
+            and self.Transparency == 0
+        )
+
+
+# FILTERS
+class ParameterElement(Element):
+
+    def __init__(self, name):
+        Element.__init__(self, name=name)
+        self._definition = Definition(name)
+
+    def GetDefinition(self):
+        return self._definition
+
+
+class FilterRule(object):
+
+    _testes = {
+        "==": lambda valor, ref: valor == ref,
+        "!=": lambda valor, ref: valor != ref,
+        "<=": lambda valor, ref: valor is not None and valor <= ref,
+        ">=": lambda valor, ref: valor is not None and valor >= ref,
+    }
+
+    def __init__(self, kind, parameter_id, value=None):
+        self.kind = kind
+        self.parameter_id = parameter_id
+        self.value = value
+
+    def _parameter(self, element):
+        nome = _nomes_nativos.get(self.parameter_id.IntegerValue)
+        if nome is None:
+            param_elem = element.Document.GetElement(self.parameter_id)
+            if param_elem is None:
+                return None
+            nome = param_elem.GetDefinition().Name
+        param = element.LookupParameter(nome)
+        if param is None and element.GetTypeId() != ElementId.InvalidElementId:
+            element_type = element.Document.GetElement(element.GetTypeId())
+            param = element_type.LookupParameter(nome) if element_type else None
+        return param
+
+    def passes(self, element):
+        param = self._parameter(element)
+        if self.kind == "hasvalue":
+            return param is not None and param.HasValue
+        valor = param._value if param is not None else None
+        return FilterRule._testes[self.kind](valor, self.value)
+
+
+class ParameterFilterRuleFactory(object):
+
+    @staticmethod
+    def CreateEqualsRule(parameter_id, value):
+        return FilterRule("==", parameter_id, value)
+
+    @staticmethod
+    def CreateNotEqualsRule(parameter_id, value):
+        return FilterRule("!=", parameter_id, value)
+
+    @staticmethod
+    def CreateLessOrEqualRule(parameter_id, value):
+        return FilterRule("<=", parameter_id, value)
+
+    @staticmethod
+    def CreateGreaterOrEqualRule(parameter_id, value):
+        return FilterRule(">=", parameter_id, value)
+
+    @staticmethod
+    def CreateHasValueParameterRule(parameter_id):
+        return FilterRule("hasvalue", parameter_id)
+
+
+class ElementParameterFilter(object):
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+
+    def PassesFilter(self, element):
+        return all(rule.passes(element) for rule in self.rules)
+
+
+class ElementCategoryFilter(object):
+
+    def __init__(self, category, inverted=False):
+        self._category = int(category)
+        self._inverted = inverted
+
+    def PassesFilter(self, element):
+        passa = element.Category is not None and element.Category.Id.IntegerValue == self._category
+        return passa != self._inverted
+
+
+class LogicalAndFilter(object):
+
+    def __init__(self, *filters):
+        self._filters = filters
+
+    def PassesFilter(self, element):
+        return all(f.PassesFilter(element) for f in self._filters)
+
+
+class LogicalOrFilter(object):
+
+    def __init__(self, *filters):
+        self._filters = filters
+
+    def PassesFilter(self, element):
+        return any(f.PassesFilter(element) for f in self._filters)
+
+
+class ParameterFilterElement(Element):
+
+    def __init__(self, name, categories, element_filter):
+        Element.__init__(self, name=name)
+        self._categories = list(categories)
+        self._element_filter = element_filter
+
+    @staticmethod
+    def Create(doc, name, categories, element_filter):
+        return doc.add(ParameterFilterElement(name, categories, element_filter))
+
+    def GetCategories(self):
+        return _TypedList(self._categories)
+
+    def SetCategories(self, categories):
+        self._categories = list(categories)
+
+    def GetElementFilter(self):
+        return self._element_filter
+
+    def SetElementFilter(self, element_filter):
+        self._element_filter = element_filter
+        return True
+
+
+class WorksharingTooltipInfo(object):
+
+    def __init__(self, owner=""):
+        self.Owner = owner
+        self.Creator = ""
+        self.LastChangedBy = ""
+
+
+class WorksharingUtils(object):
+    """Checkout simulado: `doc.owners` indica elementos reservados por outros usuários
+    e `doc.central_reachable = False` simula o central fora do ar."""
+
+    @staticmethod
+    def CheckoutElements(doc, element_ids):
+        if not doc.central_reachable:
+            raise Exception("The central model could not be reached.")
+        doc.checkouts.append(list(element_ids))
+        return _TypedList(e for e in element_ids if e.IntegerValue not in doc.owners)
+
+    @staticmethod
+    def GetWorksharingTooltipInfo(doc, element_id):
+        return WorksharingTooltipInfo(doc.owners.get(element_id.IntegerValue, ""))
+
+
+class ModelPathUtils(object):
+    """Caminhos de modelo representados como texto."""
+
+    @staticmethod
+    def ConvertModelPathToUserVisiblePath(model_path):
+        return model_path
+
+
+# DOCUMENT
+class Document(object):
+    """Documento em memória com elementos indexados por Id e UniqueId."""
+
+    def __init__(self, path_name="", is_workshared=False):
+        self.PathName = path_name
+        self.IsWorkshared = is_workshared
+        self.central_path = path_name if is_workshared else ""
+        self.Title = path_name
+        self.exports = []
+        self.checkouts = []
+        self.owners = {}
+        self.central_reachable = True
+        self._ids = itertools.count(100000)
+        self._by_id = {}
+        self._by_uid = {}
+
+    def add(self, element):
+        element.Id = ElementId(next(self._ids))
+        element.UniqueId = str(uuid.UUID(int=element.Id.IntegerValue))
+        element.Document = self
+        self._by_id[element.Id.IntegerValue] = element
+        self._by_uid[element.UniqueId] = element
+        return element
+
+    def new_type(self, params=None, name=""):
+        return self.add(ElementType(params=params, name=name))
+
+    def new_element(self, category, params=None, element_type=None, name=""):
+        type_id = element_type.Id if element_type is not None else None
+        return self.add(Element(category, params, type_id, name))
+
+    def new_assembly(self, members, params=None, name=""):
+        assembly = self.add(AssemblyInstance(params, name))
+        for member in members:
+            member.AssemblyInstanceId = assembly.Id
+            member.touch()
+            assembly._member_ids.append(member.Id)
+        return assembly
+
+    def new_sheet(self, params=None, name=""):
+        return self.add(ViewSheet(params, name))
+
+    def new_view(self, name="", cls=None):
+        return self.add((cls or View3D)(name=name))
+
+    def new_fill_pattern(self, is_solid_fill=True, name=""):
+        return self.add(FillPatternElement(is_solid_fill, name))
+
+    def new_parameter_element(self, name):
+        return self.add(ParameterElement(name))
+
+    def remove(self, element):
+        self._by_id.pop(element.Id.IntegerValue, None)
+        self._by_uid.pop(element.UniqueId, None)
+        element.IsValidObject = False
+
+    def elements(self):
+        return list(self._by_id.values())
+
+    def GetWorksharingCentralModelPath(self):
+        return self.central_path
+
+    def GetElement(self, reference):
+        if isinstance(reference, ElementId):
+            return self._by_id.get(reference.IntegerValue)
+        return self._by_uid.get(reference)
+
+    def Export(self, folder, view_ids, options):
+        """Registra a exportação e, se `folder` existir, grava PDFs vazios como o Revit nomearia."""
+        self.exports.append((folder, list(view_ids), options))
+        if not os.path.isdir(folder):
+            return True
+        if options.Combine:
+            nomes = [options.FileName]
+        else:
+            nomes = [options.pdf_name(self.GetElement(view_id)) for view_id in view_ids]
+        for nome in nomes:
+            with open(os.path.join(folder, nome + ".pdf"), "wb"):
+                pass
+        return True
+
+
+class ElementMulticategoryFilter(object):
+
+    def __init__(self, categories):
+        self._categories = set(int(c) for c in categories)
+
+    def PassesFilter(self, element):
+        return element.Category is not None and element.Category.Id.IntegerValue in self._categories
+
+
+class FilteredElementCollector(object):
+    """Coletor sobre os elementos do documento (o filtro por vista é ignorado).
+
+    Como na API, o segundo argumento pode ser o id de uma vista ou uma coleção
+    de ids, que restringe o coletor a esses elementos.
+    """
+
+    def __init__(self, doc, view_id=None):
+        self._doc = doc
+        self._view_id = view_id
+        self._filtros = []
+        if isinstance(view_id, list):
+            if not view_id:
+                raise ValueError("A coleção de ids do coletor não pode ser vazia.")
+            ids = set(i.IntegerValue for i in view_id)
+            self._filtros.append(lambda e: e.Id.IntegerValue in ids)
+
+    def _where(self, filtro):
+        self._filtros.append(filtro)
+        return self
+
+    def OfClass(self, cls):
+        return self._where(lambda e: isinstance(e, cls))
+
+    def OfCategory(self, category):
+        return self._where(lambda e: e.Category is not None and e.Category.Id.IntegerValue == int(category))
+
+    def WherePasses(self, filtro):
+        return self._where(filtro.PassesFilter)
+
+    def WhereElementIsNotElementType(self):
+        return self._where(lambda e: not isinstance(e, ElementType))
+
+    def WhereElementIsElementType(self):
+        return self._where(lambda e: isinstance(e, ElementType))
+
+    def __iter__(self):
+        for element in self._doc.elements():
+            if all(filtro(element) for filtro in self._filtros):
+                yield element
+
+    def ToElements(self):
+        return _TypedList(self)
+
+    def ToElementIds(self):
+        return _TypedList(e.Id for e in self)
+
+    def GetElementCount(self):
+        return sum(1 for _ in self)
+
+
+class Transaction(object):
+
+    def __init__(self, doc, name=""):
+        self.doc = doc
+        self.name = name
+        self._started = False
+
+    def Start(self):
+        self._started = True
+
+    def Commit(self):
+        self._started = False
+
+    def RollBack(self):
+        self._started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._started = False
+        return False
+
+
+class TransactionGroup(Transaction):
+
+    def Assimilate(self):
+        self._started = False
+
+
+class SubTransaction(object):
+    """Subtransação sem desfazer real: o substituto não guarda o estado anterior."""
+
+    def __init__(self, doc):
+        self.doc = doc
+
+    def Start(self):
+        pass
+
+    def Commit(self):
+        pass
+
+    def RollBack(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+# EXPORT OPTIONS
+class PDFExportOptions(object):
+
+    def __init__(self):
+        self.Combine = False
+        self.HideCropBoundaries = True
+        self.FileName = ""
+        self.naming_rule = []
+
+    def SetNamingRule(self, naming_rule):
+        self.naming_rule = list(naming_rule)
+
+    def pdf_name(self, sheet):
+        """Nome do PDF da folha pela regra; caracteres inválidos viram "_", como no Revit."""
+        texto = ""
+        for i, campo in enumerate(self.naming_rule):
+            nome = _nomes_nativos.get(campo.ParamId.IntegerValue)
+            if nome is None:
+                nome = next(
+                    (p.Definition.Name for p in sheet.Parameters if p.Id == campo.ParamId), ""
+                )
+            param = sheet.LookupParameter(nome)
+            valor = (param.AsValueString() or "") if param else ""
+            texto += campo.Prefix + valor + campo.Suffix
+            if i < len(self.naming_rule) - 1:
+                texto += campo.Separator
+        return re.sub(r'[\\/*?:"<>|]', "_", texto)
+
+
+class TableCellCombinedParameterData(object):
+
+    def __init__(self):
+        self.CategoryId = ElementId.InvalidElementId
+        self.ParamId = ElementId.InvalidElementId
+        self.Prefix = ""
+        self.Suffix = ""
+        self.Separator = "-"
+
+    @staticmethod
+    def Create():
+        return TableCellCombinedParameterData()
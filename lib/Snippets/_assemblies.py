@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Índice montagem → peça principal compartilhado entre a coloração e a exportação."""
+
+# IMPORTS
+from Snippets._revitapi import BuiltInCategory, ElementId
+from Snippets._utils import load_json, save_json
+
+# CATEGORIAS DAS PEÇAS PRINCIPAIS
+categorias_principais_ids = set([
+    int(BuiltInCategory.OST_StructuralColumns),
+    int(BuiltInCategory.OST_StructuralFraming),
+    int(BuiltInCategory.OST_StructuralFoundation),
+    int(BuiltInCategory.OST_Walls),
+    int(BuiltInCategory.OST_Floors),
+])
+
+
+# CLASSES
+class AssemblyIndex(object):
+    """Peça principal de cada montagem do documento, descoberta sob demanda.
+
+    Os membros de uma montagem só são percorridos na primeira vez em que ela é
+    pedida. Com `path`, o índice é lido e gravado em JSON entre execuções junto
+    com os ids dos membros de cada montagem; a entrada só é reaproveitada se a
+    montagem ainda tiver exatamente os mesmos membros, na mesma ordem, de modo
+    que incluir ou retirar um membro força uma nova varredura.
+    """
+
+    def __init__(self, doc, path=None):
+        self.doc = doc
+        self.path = path
+        self.scans = 0
+        self._main = load_json(path, self._parse) or {}
+        self._conferidas = set()
+        self._dirty = False
+
+    @staticmethod
+    def _parse(dados):
+        return dict(
+            (int(k), (v["principal"], [int(m) for m in v["membros"]]))
+            for k, v in dados["montagens"].items()
+        )
+
+    def _scan(self, assembly, member_ids):
+        self.scans += 1
+        self._dirty = True
+        main_id = None
+        for mid in member_ids:
+            membro = self.doc.GetElement(ElementId(mid))
+            if not membro or not membro.Category:
+                continue
+            if membro.Category.Id.IntegerValue in categorias_principais_ids:
+                main_id = membro.Id.IntegerValue
+                break
+        self._main[assembly.Id.IntegerValue] = (main_id, member_ids)
+        return main_id
+
+    def main_element(self, assembly):
+        """Peça principal da montagem, ou None se ela não tiver uma."""
+        chave = assembly.Id.IntegerValue
+        entrada = self._main.get(chave)
+        if chave in self._conferidas:
+            main_id = entrada[0]
+        else:
+            self._conferidas.add(chave)
+            member_ids = [mid.IntegerValue for mid in assembly.GetMemberIds()]
+            if entrada is not None and entrada[1] == member_ids:
+                main_id = entrada[0]
+            else:
+                main_id = self._scan(assembly, member_ids)
+        if main_id is None:
+            return None
+        return self.doc.GetElement(ElementId(main_id))
+
+    def save(self):
+        if not self._dirty:
+            return
+        dados = {
+            "montagens": dict(
+                (str(k), {"principal": main_id, "membros": membros})
+                for k, (main_id, membros) in self._main.items()
+            ),
+        }
+        if save_json(self.path, dados):
+            self._dirty = False
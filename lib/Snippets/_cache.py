@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Cache de parâmetros e tipos válido durante uma execução, e valores persistidos entre execuções."""
+
+# IMPORTS
+from Snippets._revitapi import AssemblyInstance, Element, ElementId
+from Snippets._utils import load_json, save_json
+
+_AUSENTE = object()
+
+
+# FUNCTIONS
+def _encode(value):
+    """Converte tuplas e dicionários com chaves tupla em estruturas JSON."""
+    if isinstance(value, dict):
+        if all(isinstance(k, type(u"")) or isinstance(k, str) for k in value):
+            return dict((k, _encode(v)) for k, v in value.items())
+        return {"__pares__": [[_encode(k), _encode(v)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value):
+    """Inverso de `_encode`; listas voltam como tuplas para servirem de chave."""
+    if isinstance(value, dict):
+        if "__pares__" in value:
+            return dict((_decode(k), _decode(v)) for k, v in value["__pares__"])
+        return dict((k, _decode(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(_decode(v) for v in value)
+    return value
+
+
+# CLASSES
+class ParameterCache(object):
+    """Memoriza parâmetros por (id do elemento, nome do parâmetro) e tipos por id do tipo."""
+
+    def __init__(self, doc, store=None):
+        self.doc = doc
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._tipos = {}
+        self._params = {}
+        self._valores = {}
+
+    def _memo(self, store, key, factory):
+        if key in store:
+            self.hits += 1
+            return store[key]
+        self.misses += 1
+        value = factory()
+        store[key] = value
+        return value
+
+    def get_type(self, element):
+        if element is None:
+            return None
+        type_id = element.GetTypeId()
+        if not type_id or type_id == ElementId.InvalidElementId:
+            return None
+        return self._memo(self._tipos, type_id.IntegerValue, lambda: self.doc.GetElement(type_id))
+
+    def get_instance_parameter(self, element, param_name):
+        key = (element.Id.IntegerValue, param_name, False)
+        return self._memo(self._params, key, lambda: element.LookupParameter(param_name))
+
+    def get_parameter(self, element, param_name):
+        """Parâmetro de instância ou, na falta dele, o parâmetro do tipo."""
+        def lookup():
+            param = self.get_instance_parameter(element, param_name)
+            if param:
+                return param
+            element_type = self.get_type(element)
+            if element_type:
+                return self.get_instance_parameter(element_type, param_name)
+            return None
+        key = (element.Id.IntegerValue, param_name, True)
+        return self._memo(self._params, key, lookup)
+
+    def get_value(self, element, param_name, reader, persistent=False):
+        """Valor já tratado de um parâmetro, calculado uma única vez por `reader(cache, element, param_name)`.
+
+        Com `persistent`, o valor também é procurado e gravado no `store` em disco.
+        """
+        def compute():
+            if not persistent or self.store is None:
+                return reader(self, element, param_name)
+            value = self.store.get(element, param_name)
+            if value is _AUSENTE:
+                value = reader(self, element, param_name)
+                self.store.put(element, param_name, value)
+            return value
+        key = (element.Id.IntegerValue, param_name)
+        return self._memo(self._valores, key, compute)
+
+    def report(self):
+        total = self.hits + self.misses
+        taxa = 100.0 * self.hits / total if total else 0.0
+        texto = "Cache de parâmetros: {} acertos, {} falhas ({:.1f}% reaproveitado).".format(
+            self.hits, self.misses, taxa
+        )
+        if self.store is not None:
+            texto += "\n" + self.store.report()
+        return texto
+
+
+class ElementValueStore(object):
+    """Valores extraídos por elemento, gravados em JSON ao lado do modelo (ver `model_data_path`).
+
+    Cada entrada é indexada pelo UniqueId e guarda o VersionGuid do elemento,
+    do seu tipo e, nas montagens, dos membros e dos tipos dos membros. A
+    entrada só é reaproveitada se todas essas versões continuarem as mesmas;
+    basta editar o elemento (ou o que ele herda) para que seja lido de novo.
+    Sem `Element.VersionGuid` (Revit anterior a 2024) nada é persistido.
+    Como toda entrada é conferida pelas versões, a gravação simultânea por
+    duas estações custa no máximo releituras, nunca um valor desatualizado.
+    """
+
+    def __init__(self, doc, path):
+        self.doc = doc
+        self.path = path
+        self.enabled = bool(path) and hasattr(Element, "VersionGuid")
+        self.reused = 0
+        self.stored = 0
+        self.invalidated = 0
+        self._validadas = set()
+        self._elementos = self._load() if self.enabled else {}
+        self._dirty = False
+
+    def _load(self):
+        return load_json(self.path, lambda dados: dict(dados.get("elementos", {}))) or {}
+
+    def _version(self, element_id):
+        element = self.doc.GetElement(ElementId(element_id))
+        if element is None:
+            return None
+        return str(element.VersionGuid)
+
+    def _dependencias(self, element):
+        ids = [element.Id]
+        type_id = element.GetTypeId()
+        if type_id and type_id != ElementId.InvalidElementId:
+            ids.append(type_id)
+        if isinstance(element, AssemblyInstance):
+            for member_id in element.GetMemberIds():
+                ids.append(member_id)
+                membro = self.doc.GetElement(member_id)
+                member_type_id = membro.GetTypeId() if membro else None
+                if member_type_id and member_type_id != ElementId.InvalidElementId:
+                    ids.append(member_type_id)
+        return [[i.IntegerValue, self._version(i.IntegerValue)] for i in ids]
+
+    def _entrada(self, element):
+        uid = element.UniqueId
+        entrada = self._elementos.get(uid)
+        if entrada is None or uid in self._validadas:
+            return entrada
+        self._validadas.add(uid)
+        if all(self._version(i) == versao for i, versao in entrada["versoes"]):
+            return entrada
+        self.invalidated += 1
+        self._dirty = True
+        del self._elementos[uid]
+        return None
+
+    def get(self, element, key):
+        if not self.enabled:
+            return _AUSENTE
+        entrada = self._entrada(element)
+        if entrada is None or key not in entrada["valores"]:
+            return _AUSENTE
+        self.reused += 1
+        return _decode(entrada["valores"][key])
+
+    def put(self, element, key, value):
+        if not self.enabled:
+            return
+        entrada = self._entrada(element)
+        if entrada is None:
+            entrada = {"versoes": self._dependencias(element), "valores": {}}
+            self._elementos[element.UniqueId] = entrada
+            self._validadas.add(element.UniqueId)
+        entrada["valores"][key] = _encode(value)
+        self.stored += 1
+        self._dirty = True
+
+    def refresh(self, element_ids):
+        """Registra a versão atual dos elementos nas entradas já conferidas nesta execução.
+
+        Para depois de gravações que não alteram os valores guardados, como os
+        parâmetros de exportação, que de outro modo invalidariam as entradas.
+        """
+        atualizar = set(i.IntegerValue for i in element_ids)
+        for uid in self._validadas:
+            entrada = self._elementos.get(uid)
+            if entrada is None:
+                continue
+            for dependencia in entrada["versoes"]:
+                if dependencia[0] in atualizar:
+                    dependencia[1] = self._version(dependencia[0])
+                    self._dirty = True
+
+    def save(self):
+        if not self.enabled or not self._dirty:
+            return
+        if save_json(self.path, {"elementos": self._elementos}):
+            self._dirty = False
+
+    def report(self):
+        return "Cache em disco: {} valores reaproveitados, {} lidos do modelo, {} elementos alterados.".format(
+            self.reused, self.stored, self.invalidated
+        )
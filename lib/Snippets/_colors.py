@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""Coloração dos elementos da vista por status da peça ou número de revisões."""
+
+# IMPORTS
+from Snippets._assemblies import AssemblyIndex
+from Snippets._revitapi import (
+    AssemblyInstance,
+    BuiltInCategory,
+    Color,
+    ElementId,
+    ElementMulticategoryFilter,
+    FillPatternElement,
+    FilteredElementCollector,
+    List,
+    OverrideGraphicSettings,
+    Transaction,
+)
+from Snippets._status import (
+    PARAM_EXPORTADO,
+    PARAM_REVISOES,
+    PARAM_STATUS,
+    get_color_for_revisoes,
+    get_color_for_status,
+    paleta_revisoes,
+    paleta_status,
+)
+from Snippets._utils import fold_text, load_json, save_json
+from Snippets._views import template_controls_filters
+
+# CATEGORIAS DE INTERESSE
+categorias_interesse = [
+    BuiltInCategory.OST_StructuralColumns,
+    BuiltInCategory.OST_StructuralFraming,
+    BuiltInCategory.OST_StructuralFoundation,
+    BuiltInCategory.OST_Floors,
+    BuiltInCategory.OST_Walls,
+    BuiltInCategory.OST_Assemblies,
+]
+categorias_ids = set(int(c) for c in categorias_interesse)
+
+# Prefixo dos filtros de vista criados pela coloração por filtros
+PREFIXO_FILTRO = "Plannix - "
+
+cores_revit = {}
+_SEM_CHAVE = object()
+
+
+# FUNCTIONS
+def get_solid_fill_id(doc):
+    patterns = FilteredElementCollector(doc).OfClass(FillPatternElement).ToElements()
+    for fp in patterns:
+        if fp.GetFillPattern().IsSolidFill:
+            return fp.Id
+    return ElementId.InvalidElementId
+
+
+def get_status(element):
+    if element is None:
+        return ""
+    param = element.LookupParameter(PARAM_STATUS)
+    if not param:
+        return ""
+    value = param.AsValueString() or param.AsString() or ""
+    return value.strip()
+
+
+def revit_color(rgb):
+    color = cores_revit.get(rgb)
+    if color is None:
+        color = Color(*rgb)
+        cores_revit[rgb] = color
+    return color
+
+
+def get_status_key(element):
+    """Status normalizado, para que grafias diferentes do mesmo status não gerem recoloração."""
+    return fold_text(get_status(element))
+
+
+def get_revisoes_key(element):
+    """Faixa de revisão da peça: -1 se não exportada, senão o número de revisões."""
+    if element is None:
+        return -1
+    param_exp = element.LookupParameter(PARAM_EXPORTADO)
+    param_rev = element.LookupParameter(PARAM_REVISOES)
+    exportado = param_exp.AsInteger() == 1 if param_exp else False
+    if not exportado:
+        return -1
+    try:
+        revisoes = param_rev.AsInteger() if param_rev else 0
+    except:
+        revisoes = 0
+    return max(0, min(revisoes, 5))
+
+
+def get_color_for_revisoes_key(key):
+    return get_color_for_revisoes(key >= 0, key)
+
+
+# MODO → (chave do elemento, cor RGB da chave, paleta)
+MODO_STATUS   = "status"
+MODO_REVISOES = "revisoes"
+modos_coloracao = {
+    MODO_STATUS  : (get_status_key, get_color_for_status, paleta_status),
+    MODO_REVISOES: (get_revisoes_key, get_color_for_revisoes_key, paleta_revisoes),
+}
+
+
+def make_override(color, solid_fill_id):
+    ogs = OverrideGraphicSettings()
+    ogs.SetSurfaceForegroundPatternColor(color)
+    if solid_fill_id != ElementId.InvalidElementId:
+        ogs.SetSurfaceForegroundPatternId(solid_fill_id)
+    ogs.SetSurfaceTransparency(0)
+    return ogs
+
+
+def same_override(atual, esperado):
+    """Verdadeiro se o override da vista ainda tem a cor e o padrão de `esperado`."""
+    cor = atual.SurfaceForegroundPatternColor
+    ref = esperado.SurfaceForegroundPatternColor
+    return (
+        cor is not None
+        and cor.IsValid
+        and (cor.Red, cor.Green, cor.Blue) == (ref.Red, ref.Green, ref.Blue)
+        and atual.SurfaceForegroundPatternId == esperado.SurfaceForegroundPatternId
+    )
+
+
+def build_override_pool(paleta, solid_fill_id):
+    """Um OverrideGraphicSettings pronto por cor da paleta, criado uma vez por execução."""
+    return dict((rgb, make_override(revit_color(rgb), solid_fill_id)) for rgb in paleta)
+
+
+def view_collector(doc, view):
+    """Coletor da vista restrito às categorias de interesse por um único filtro multicategoria."""
+    filtro = ElementMulticategoryFilter(List[BuiltInCategory](categorias_interesse))
+    return (
+        FilteredElementCollector(doc, view.Id)
+        .WherePasses(filtro)
+        .WhereElementIsNotElementType()
+    )
+
+
+def collect_by_category(doc, view):
+    """Elementos da vista separados por id de categoria, em uma única passada."""
+    buckets = dict((c, []) for c in categorias_ids)
+    for element in view_collector(doc, view):
+        buckets[element.Category.Id.IntegerValue].append(element)
+    return buckets
+
+
+def apply_colors_generic(doc, views, modo, transaction_name, snapshot=None, assembly_index=None):
+    """Aplica as cores do `modo` nas vistas, em uma única transação, e retorna a contagem.
+
+    A chave de cor de cada elemento é lida uma única vez e reaproveitada em
+    todas as vistas. Com `snapshot`, só recebem override em cada vista os
+    elementos novos ou cuja chave mudou desde a última execução, os que saíram
+    da vista têm o override limpo e o snapshot é atualizado. Antes de pular um
+    elemento de chave inalterada, confere-se na vista que o override ainda é o
+    da cor esperada, já que desfazer, redefinir a V/G ou sincronizar a vista
+    apagam os overrides sem passar pelo snapshot. Montagens recebem
+    a cor da peça principal, obtida de `assembly_index` (construído aqui se não
+    for informado).
+    """
+    get_key, get_color, paleta = modos_coloracao[modo]
+    contagem = {"aplicadas": 0, "inalteradas": 0, "removidas": 0}
+    pool = build_override_pool(paleta, get_solid_fill_id(doc))
+    if assembly_index is None:
+        assembly_index = AssemblyIndex(doc)
+    overrides = {}
+    chaves = {}
+    empty_ogs = OverrideGraphicSettings()
+
+    def override_for(key):
+        ogs = overrides.get(key)
+        if ogs is None:
+            ogs = overrides[key] = pool[get_color(key)]
+        return ogs
+
+    def key_for(element, assembly=False):
+        id_int = element.Id.IntegerValue
+        key = chaves.get(id_int, _SEM_CHAVE)
+        if key is _SEM_CHAVE:
+            if assembly:
+                key = get_key(assembly_index.main_element(element))
+            else:
+                key = get_key(element)
+            chaves[id_int] = key
+        return key
+
+    with Transaction(doc, transaction_name) as t:
+        t.Start()
+        for view in views:
+            view_id = view.Id.IntegerValue
+            anteriores = (snapshot.get(view_id, modo) if snapshot is not None else None) or {}
+            atuais = {}
+
+            def colorir(element_id, key):
+                atuais[element_id.IntegerValue] = key
+                ogs = override_for(key)
+                if (
+                    anteriores.get(element_id.IntegerValue, _SEM_CHAVE) == key
+                    and same_override(view.GetElementOverrides(element_id), ogs)
+                ):
+                    contagem["inalteradas"] += 1
+                    return
+                view.SetElementOverrides(element_id, ogs)
+                contagem["aplicadas"] += 1
+
+            buckets = collect_by_category(doc, view)
+            assemblies = buckets.pop(int(BuiltInCategory.OST_Assemblies))
+            for elements in buckets.values():
+                for element in elements:
+                    colorir(element.Id, key_for(element))
+            for assembly in assemblies:
+                if not isinstance(assembly, AssemblyInstance):
+                    continue
+                colorir(assembly.Id, key_for(assembly, assembly=True))
+
+            # Elementos do snapshot que não estão mais na vista
+            for id_int in anteriores:
+                if id_int in atuais:
+                    continue
+                element_id = ElementId(id_int)
+                if doc.GetElement(element_id) is not None:
+                    view.SetElementOverrides(element_id, empty_ogs)
+                contagem["removidas"] += 1
+            if snapshot is not None:
+                snapshot.set(view_id, modo, atuais)
+        t.Commit()
+    return contagem
+
+
+def has_color_override(ogs):
+    """Verdadeiro se a vista aplica cor, padrão ou transparência de superfície no elemento."""
+    color = ogs.SurfaceForegroundPatternColor
+    return (
+        (color is not None and color.IsValid)
+        or ogs.SurfaceForegroundPatternId != ElementId.InvalidElementId
+        or ogs.Transparency != 0
+    )
+
+
+def remove_plannix_filters(doc, view, manter_prefixo=None):
+    """Retira da vista os filtros da coloração, exceto os que começam com `manter_prefixo`.
+
+    Vistas cujos filtros são controlados pelo modelo de vista não são alteradas.
+    """
+    if template_controls_filters(doc, view):
+        return
+    for filter_id in list(view.GetFilters()):
+        nome = doc.GetElement(filter_id).Name
+        if not nome.startswith(PREFIXO_FILTRO):
+            continue
+        if manter_prefixo and nome.startswith(manter_prefixo):
+            continue
+        view.RemoveFilter(filter_id)
+
+
+def remove_colors(doc, views, snapshot=None):
+    """Limpa os overrides das vistas em uma única transação e retorna quantos foram limpos.
+
+    Só são regravados os elementos com override de superfície na vista e os
+    listados no `snapshot` da coloração anterior; o snapshot das vistas é
+    descartado ao final. Os filtros de vista da coloração também são retirados.
+    """
+    count = 0
+    empty_ogs = OverrideGraphicSettings()
+    with Transaction(doc, "Colorir Modelo - Remover") as t:
+        t.Start()
+        for view in views:
+            alvos = set()
+            if snapshot is not None:
+                for id_int in snapshot.ids(view.Id.IntegerValue):
+                    if doc.GetElement(ElementId(id_int)) is not None:
+                        alvos.add(id_int)
+            for element_id in view_collector(doc, view).ToElementIds():
+                if element_id.IntegerValue in alvos:
+                    continue
+                if has_color_override(view.GetElementOverrides(element_id)):
+                    alvos.add(element_id.IntegerValue)
+            for id_int in alvos:
+                view.SetElementOverrides(ElementId(id_int), empty_ogs)
+            count += len(alvos)
+            remove_plannix_filters(doc, view)
+            if snapshot is not None:
+                snapshot.clear(view.Id.IntegerValue)
+        t.Commit()
+    return count
+
+
+def clear_snapshot_overrides(doc, views, snapshot):
+    """Desfaz os overrides por elemento gravados no `snapshot` e retorna quantos foram limpos.
+
+    Usado ao trocar a coloração por elemento pela de filtros: só os ids que a
+    própria coloração registrou são regravados, sem percorrer os elementos da
+    vista, de modo que overrides feitos à mão são preservados.
+    """
+    alvos_por_vista = []
+    for view in views:
+        ids = snapshot.ids(view.Id.IntegerValue)
+        if ids:
+            alvos_por_vista.append((view, ids))
+    if not alvos_por_vista:
+        return 0
+    count = 0
+    empty_ogs = OverrideGraphicSettings()
+    with Transaction(doc, "Colorir Modelo - Remover") as t:
+        t.Start()
+        for view, ids in alvos_por_vista:
+            for id_int in ids:
+                element_id = ElementId(id_int)
+                if doc.GetElement(element_id) is not None:
+                    view.SetElementOverrides(element_id, empty_ogs)
+                    count += 1
+            snapshot.clear(view.Id.IntegerValue)
+        t.Commit()
+    return count
+
+
+# CLASSES
+class ColorSnapshot(object):
+    """Chaves de cor aplicadas em cada vista, gravadas em JSON entre execuções.
+
+    Para cada vista guarda o modo de coloração e o mapa id do elemento → chave
+    (status ou faixa de revisão). Um snapshot de outro modo é ignorado.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._vistas = load_json(path, dict) or {}
+
+    def get(self, view_id, modo):
+        entrada = self._vistas.get(str(view_id))
+        if not entrada or entrada.get("modo") != modo:
+            return None
+        return dict((int(k), v) for k, v in entrada["cores"].items())
+
+    def ids(self, view_id):
+        """Ids coloridos na vista pela última execução, em qualquer modo."""
+        entrada = self._vistas.get(str(view_id))
+        if not entrada:
+            return []
+        return [int(k) for k in entrada["cores"]]
+
+    def set(self, view_id, modo, cores):
+        self._vistas[str(view_id)] = {
+            "modo": modo,
+            "cores": dict((str(k), v) for k, v in cores.items()),
+        }
+
+    def clear(self, view_id):
+        self._vistas.pop(str(view_id), None)
+
+    def save(self):
+        save_json(self.path, self._vistas)
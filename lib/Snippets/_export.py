@@ -0,0 +1,806 @@
+# -*- coding: utf-8 -*-
+"""Lógica de exportação do Plannix: leitura de parâmetros, agrupamento e blocos do XML.
+
+Independe da interface do Revit (uidoc, pyRevit) e recebe o documento por meio do
+`ParameterCache`, de modo que pode ser executada com o substituto de
+`benchmarks/fakerevit.py` fora do Revit.
+"""
+
+# IMPORTS
+import re
+from Snippets._assemblies import categorias_principais_ids
+from Snippets._params import ParametroAusenteError, find_parameter_ids
+from Snippets._revitapi import (
+    AssemblyInstance,
+    BuiltInCategory,
+    BuiltInParameter,
+    ElementCategoryFilter,
+    ElementId,
+    ElementMulticategoryFilter,
+    ElementParameterFilter,
+    FilteredElementCollector,
+    FilterRule,
+    List,
+    LogicalAndFilter,
+    LogicalOrFilter,
+    ParameterFilterRuleFactory,
+    StorageType,
+    UnitTypeId,
+    UnitUtils,
+)
+from Snippets._utils import natural_key
+
+# SOFT VARIABLES
+NOMEPECA = "Modelo"
+MARCA = "Marca"
+CODCONTROLE = ""
+DESENHO = ""
+TIPOPRODUTO = "03. PRODUTO"
+GRUPO = "04. GRUPO"
+SECAO = "05. SEÇÃO"
+INFOADICIONAL = "09. INFO ADICIONAL"
+COMPRIMENTO = "08. COMPRIMENTO"
+ALTURA = "07. ALTURA"
+LARGURA = "06. LARGURA"
+VOLUMEUNITARIO = "Volume"
+PESO = "Peso"
+AREA = ""
+CLASSECONCRETO = "12. FCK"
+ACABAMENTO = ""
+COBRIMENTO = "13. COBRIMENTO"
+OBS = ""
+TABELAACO = ""
+COMPLEMENTOS = ""
+
+# PARÂMETROS OBRIGATÓRIOS (nos pilares, ALTURA substitui COMPRIMENTO)
+PARAMETROS_OBRIGATORIOS = [
+    NOMEPECA,
+    TIPOPRODUTO,
+    GRUPO,
+    SECAO,
+    INFOADICIONAL,
+    COMPRIMENTO,
+    VOLUMEUNITARIO,
+]
+
+# Parâmetros nativos do Revit, que não têm ParameterElement no documento
+parametros_nativos = {
+    NOMEPECA      : BuiltInParameter.ALL_MODEL_MODEL,
+    VOLUMEUNITARIO: BuiltInParameter.HOST_VOLUME_COMPUTED,
+}
+
+
+# FUNCTIONS
+def safe_float(value):
+    if not value:
+        return 0.0
+    try:
+        return float(value.replace(",", "."))
+    except:
+        return 0.0
+
+
+def get_nome_peca(cache, element):
+    modelo = parameter_get(cache, element, NOMEPECA)
+    marca = parameter_get(cache, element, MARCA)
+    if modelo and marca:
+        return "{}{}".format(modelo, marca)
+    elif modelo:
+        return modelo
+    else:
+        return str(element.Id)
+
+
+def _value_string(element, parameter_name):
+    """Valor de exibição lido direto do elemento, sem passar pelo cache."""
+    param = element.LookupParameter(parameter_name)
+    if not param:
+        return ""
+    return param.AsValueString() or ""
+
+
+def parameter_get(cache, element, parameter_name):
+    if parameter_name == "":
+        return ""
+    return cache.get_value(element, parameter_name, read_parameter, persistent=True)
+
+
+def read_parameter(cache, element, parameter_name):
+    param = cache.get_parameter(element, parameter_name)
+    if not param:
+        return ""
+    if parameter_name == VOLUMEUNITARIO:
+        try:
+            volume_ft3 = param.AsDouble()
+            volume_m3 = volume_ft3 * 0.028316846592
+            return "{:.3f}".format(volume_m3)
+        except:
+            return ""
+    if parameter_name == PESO:
+        try:
+            valor = param.AsDouble()
+            return "{:.3f}".format(valor)
+        except:
+            value = param.AsValueString()
+            if not value:
+                return ""
+            return value.replace(",", ".")
+    value = param.AsValueString()
+    if not value:
+        return ""
+    return value.replace(",", ".")
+
+
+def required_parameters(is_pilar):
+    if not is_pilar:
+        return list(PARAMETROS_OBRIGATORIOS)
+    return [ALTURA if p == COMPRIMENTO else p for p in PARAMETROS_OBRIGATORIOS]
+
+
+def required_parameter_ids(doc, parameter_names):
+    """Ids dos parâmetros por nome; os nativos não passam pela busca no documento."""
+    ids = dict(
+        (p, ElementId(parametros_nativos[p])) for p in parameter_names if p in parametros_nativos
+    )
+    ids.update(find_parameter_ids(doc, [p for p in parameter_names if p not in ids]))
+    return ids
+
+
+def _is_pilar(element):
+    return bool(
+        element.Category
+        and element.Category.Id.IntegerValue == int(BuiltInCategory.OST_StructuralColumns)
+    )
+
+
+def required_parameters_filter(doc):
+    """Filtro do Revit que só aceita peças com todos os parâmetros obrigatórios preenchidos.
+
+    Retorna None quando a API não tem a regra HasValue (Revit anterior a 2023);
+    levanta ParametroAusenteError se algum parâmetro não existir no documento.
+    """
+    factory = ParameterFilterRuleFactory
+    if not hasattr(factory, "CreateHasValueParameterRule"):
+        return None
+    ids = required_parameter_ids(doc, PARAMETROS_OBRIGATORIOS + [ALTURA])
+
+    def preenchidos(is_pilar):
+        regras = [factory.CreateHasValueParameterRule(ids[p]) for p in required_parameters(is_pilar)]
+        return ElementParameterFilter(List[FilterRule](regras))
+
+    pilares = BuiltInCategory.OST_StructuralColumns
+    return LogicalOrFilter(
+        LogicalAndFilter(ElementCategoryFilter(pilares), preenchidos(True)),
+        LogicalAndFilter(ElementCategoryFilter(pilares, True), preenchidos(False)),
+    )
+
+
+def _model_collector(doc):
+    categorias = List[ElementId]([ElementId(c) for c in sorted(categorias_principais_ids)])
+    return (
+        FilteredElementCollector(doc)
+        .WherePasses(ElementMulticategoryFilter(categorias))
+        .WhereElementIsNotElementType()
+    )
+
+
+def collect_model_pieces(doc, assembly_index, element_filter=None):
+    """Peças do modelo inteiro: as que estão fora de montagens e a principal de cada montagem.
+
+    Com `element_filter` (ver `required_parameters_filter`), só as peças aceitas
+    pelo Revit chegam ao Python.
+    """
+    collector = _model_collector(doc)
+    if element_filter is not None:
+        collector = collector.WherePasses(element_filter)
+    pecas = []
+    for element in collector:
+        if element.AssemblyInstanceId == ElementId.InvalidElementId:
+            pecas.append(element)
+            continue
+        main_element = assembly_index.main_element(doc.GetElement(element.AssemblyInstanceId))
+        if main_element is not None and main_element.Id == element.Id:
+            pecas.append(element)
+    return pecas
+
+
+def incomplete_model_pieces(doc, element_filter):
+    """Resumo dos elementos das categorias de peças recusados pelo `element_filter`.
+
+    Retorna (quantidade, nomes). A contagem é feita pelo Revit; só os recusados
+    com NOMEPECA preenchido são lidos, para informar o nome. Os demais (peças
+    moldadas no local, paredes e lajes comuns) entram apenas na contagem.
+    """
+    aceitas = set(i.IntegerValue for i in _model_collector(doc).WherePasses(element_filter).ToElementIds())
+    quantidade = _model_collector(doc).GetElementCount() - len(aceitas)
+    if not quantidade:
+        return 0, []
+    regra = ParameterFilterRuleFactory.CreateHasValueParameterRule(ElementId(parametros_nativos[NOMEPECA]))
+    nomes = []
+    for element in _model_collector(doc).WherePasses(ElementParameterFilter(List[FilterRule]([regra]))):
+        if element.Id.IntegerValue in aceitas:
+            continue
+        modelo = _value_string(element, NOMEPECA)
+        if modelo:
+            nomes.append(modelo + _value_string(element, MARCA))
+    return quantidade, sorted(nomes, key=natural_key)
+
+
+def passing_element_ids(doc, elements, element_filter):
+    """Ids (inteiros) dos `elements` aceitos pelo `element_filter`, avaliado pelo próprio Revit."""
+    ids = List[ElementId]([e.Id for e in elements])
+    if not ids.Count:
+        return set()
+    collector = FilteredElementCollector(doc, ids).WherePasses(element_filter)
+    return set(i.IntegerValue for i in collector.ToElementIds())
+
+
+def rejection_reason(cache, element):
+    """Motivo pelo qual a peça não pode ser exportada, ou None se ela tiver todos os obrigatórios."""
+    for parametro_real in required_parameters(_is_pilar(element)):
+        param = cache.get_parameter(element, parametro_real)
+        if not param:
+            return (
+                "O elemento '{}' foi removido porque não possui o parâmetro "
+                "obrigatório '{}' definido."
+                .format(get_nome_peca(cache, element), parametro_real)
+            )
+        valor = param.AsValueString()
+        if valor is None or valor == "":
+            return (
+                "O elemento '{}' foi removido porque está com o parâmetro "
+                "obrigatório '{}' vazio."
+                .format(get_nome_peca(cache, element), parametro_real)
+            )
+    return None
+
+
+def filter_elements(cache, list_of_elements, element_filter=None):
+    """Peças com todos os parâmetros obrigatórios preenchidos, na ordem recebida.
+
+    O teste é feito pelo Revit com `required_parameters_filter` (ou com o
+    `element_filter` já montado por quem chama); só as peças recusadas voltam a
+    ser examinadas em Python, para informar o motivo. Sem o filtro (Revit
+    antigo ou parâmetro ausente no documento) todas são examinadas em Python.
+
+    A regra HasValue aceita texto vazio, então as aprovadas pelo Revit ainda
+    passam pela verificação de valor vazio. Ela usa `parameter_get`, cujos
+    valores o agrupamento reaproveita do cache em seguida.
+    """
+    if element_filter is None:
+        try:
+            element_filter = required_parameters_filter(cache.doc)
+        except ParametroAusenteError:
+            element_filter = None
+    aprovados = None
+    if element_filter is not None:
+        aprovados = passing_element_ids(cache.doc, list_of_elements, element_filter)
+    accepted_output = []
+    for element in list_of_elements:
+        if aprovados is not None and element.Id.IntegerValue in aprovados:
+            if all(parameter_get(cache, element, p) for p in required_parameters(_is_pilar(element))):
+                accepted_output.append(element)
+                continue
+        motivo = rejection_reason(cache, element)
+        if motivo:
+            print(motivo)
+        else:
+            accepted_output.append(element)
+    return accepted_output
+
+
+def group_elements(cache, elements):
+    grupos = {}
+    for element in elements:
+        nomepeca = get_nome_peca(cache, element)
+        tipoproduto = parameter_get(cache, element, TIPOPRODUTO)
+        grupo = parameter_get(cache, element, GRUPO)
+        secao = parameter_get(cache, element, SECAO)
+        infoadicional = parameter_get(cache, element, INFOADICIONAL)
+        comprimento = parameter_get(cache, element, COMPRIMENTO)
+        altura = parameter_get(cache, element, ALTURA)
+        largura = parameter_get(cache, element, LARGURA)
+        volumeunitario = parameter_get(cache, element, VOLUMEUNITARIO)
+        peso = parameter_get(cache, element, PESO)
+        area = parameter_get(cache, element, AREA)
+        classeconcreto = parameter_get(cache, element, CLASSECONCRETO)
+        acabamento = parameter_get(cache, element, ACABAMENTO)
+        cobrimento = parameter_get(cache, element, COBRIMENTO)
+        obs = parameter_get(cache, element, OBS)
+        tabelaaco = parameter_get(cache, element, TABELAACO)
+        complementos = parameter_get(cache, element, COMPLEMENTOS)
+        chave = (
+            nomepeca,
+            tipoproduto,
+            grupo,
+            secao,
+            infoadicional,
+        )
+        comprimento_f = safe_float(comprimento)
+        altura_f = safe_float(altura)
+        largura_f = safe_float(largura)
+        volume_f = safe_float(volumeunitario)
+        resumo = get_assembly_summary(cache, element)
+        if resumo is not None:
+            fck_principal = classeconcreto
+            for membro_id, fck_membro, volume_m3 in resumo["volumes"]:
+                if membro_id == element.Id.IntegerValue:
+                    continue
+                if fck_membro and fck_principal and fck_membro == fck_principal:
+                    volume_f += volume_m3
+        peso_f = safe_float(peso)
+        area_f = safe_float(area)
+        if chave not in grupos:
+            grupos[chave] = {
+                "elemento_base": element,
+                "quantidade": 1,
+                "ids": [element.UniqueId],
+                "soma_comprimento": comprimento_f,
+                "soma_altura": altura_f,
+                "soma_largura": largura_f,
+                "soma_volume": volume_f,
+                "soma_peso": peso_f,
+                "soma_area": area_f,
+                "classeconcreto": classeconcreto,
+                "acabamento": acabamento,
+                "cobrimento": cobrimento,
+                "obs": obs,
+                "tabelaaco": tabelaaco,
+                "complementos": complementos,
+            }
+        else:
+            grupos[chave]["quantidade"] += 1
+            grupos[chave]["ids"].append(element.UniqueId)
+            grupos[chave]["soma_comprimento"] += comprimento_f
+            grupos[chave]["soma_altura"] += altura_f
+            grupos[chave]["soma_largura"] += largura_f
+            grupos[chave]["soma_volume"] += volume_f
+            grupos[chave]["soma_peso"] += peso_f
+            grupos[chave]["soma_area"] += area_f
+    return grupos
+
+
+def get_main_element(assembly_index, element):
+    if not isinstance(element, AssemblyInstance):
+        return element
+    main_element = assembly_index.main_element(element)
+    if main_element:
+        return main_element
+    print(
+        "A montagem '{}' não possui uma peça principal válida para exportação."
+        .format(element.Id)
+    )
+    return None
+
+
+# Chaves dos resumos guardados no ParameterCache
+RESUMO_VERGALHAO = "#tipo de vergalhão"
+RESUMO_TELA = "#tipo de tela"
+RESUMO_MONTAGEM = "#resumo da montagem"
+
+
+def limpar_bitola(bitola):
+    if not bitola:
+        return ""
+    bitola = bitola.replace("Ø", "")
+    bitola = bitola.replace("RB", "")
+    return bitola.strip()
+
+
+def read_rebar_type(cache, rebar_type, _name=None):
+    """(material, bitola, fator de peso em kg/m) de um RebarBarType."""
+    if rebar_type is None:
+        return "", "", None
+    param_material = cache.get_instance_parameter(rebar_type, "Material")
+    material = param_material.AsValueString() if param_material else ""
+    param_bitola = cache.get_instance_parameter(rebar_type, "Nome do tipo")
+    bitola = limpar_bitola(param_bitola.AsString() if param_bitola else "")
+    fator_peso = None
+    param_fator = cache.get_instance_parameter(rebar_type, "Fator de Peso")
+    if param_fator:
+        try:
+            fator_peso = UnitUtils.ConvertFromInternalUnits(
+                param_fator.AsDouble(),
+                UnitTypeId.KilogramsPerMeter
+            )
+        except:
+            fator_peso = None
+    return material or "", bitola, fator_peso
+
+
+def read_fabric_type(cache, fabric_type, _name=None):
+    """(tipo, bitola) de um tipo de tela soldada."""
+    if fabric_type is None:
+        return "TELA", ""
+    param_material = cache.get_instance_parameter(fabric_type, "Material")
+    tipo = param_material.AsValueString() if param_material else "TELA"
+    param_bitola = cache.get_instance_parameter(fabric_type, "Nome do tipo")
+    bitola = limpar_bitola(param_bitola.AsString() if param_bitola else "")
+    return tipo, bitola
+
+
+def get_type_attributes(cache, element, key, reader):
+    """Atributos do tipo do elemento, lidos uma única vez por tipo."""
+    element_type = cache.get_type(element)
+    if element_type is None:
+        return reader(cache, None)
+    return cache.get_value(element_type, key, reader)
+
+
+def _resumir_aco(cache, membro, categoria_id, resumo):
+    FABRIC_CAT = int(BuiltInCategory.OST_FabricReinforcement)
+    REBAR_CAT = int(BuiltInCategory.OST_Rebar)
+    if categoria_id == FABRIC_CAT:
+        tipo, bitola = get_type_attributes(cache, membro, RESUMO_TELA, read_fabric_type)
+        param_massa = cache.get_instance_parameter(membro, "Massa da folha de corte")
+        massa_kg = 0
+        if param_massa:
+            try:
+                massa_kg = UnitUtils.ConvertFromInternalUnits(
+                    param_massa.AsDouble(),
+                    UnitTypeId.Kilograms
+                )
+            except:
+                massa_kg = 0
+        telas = resumo["telas"]
+        chave = (tipo, bitola)
+        if chave not in telas:
+            telas[chave] = 0
+        telas[chave] += massa_kg
+        return
+    if categoria_id != REBAR_CAT:
+        return
+    rebar = membro
+    material, bitola, fator_peso = get_type_attributes(cache, rebar, RESUMO_VERGALHAO, read_rebar_type)
+    if material and material.upper().startswith("TELA"):
+        return
+    param_pos = cache.get_instance_parameter(rebar, "Número do vergalhão")
+    if not param_pos:
+        return
+    if param_pos.StorageType == StorageType.Integer:
+        numero_str = str(param_pos.AsInteger())
+    elif param_pos.StorageType == StorageType.String:
+        numero_str = param_pos.AsString()
+    else:
+        numero_str = param_pos.AsValueString()
+    if not numero_str:
+        return
+    posicao = "N{}".format(numero_str.strip())
+    param_qtde = cache.get_instance_parameter(rebar, "Quantidade")
+    qtde = param_qtde.AsInteger() if param_qtde else 0
+    param_comp = cache.get_instance_parameter(rebar, "Comprimento total da barra")
+    if not param_comp:
+        return
+    comprimento_m = UnitUtils.ConvertFromInternalUnits(
+        param_comp.AsDouble(),
+        UnitTypeId.Meters
+    )
+    produto = "ACO"
+    tipo = material
+    grupos = resumo["aco"]
+    chave = (posicao, produto, tipo, bitola)
+    if chave not in grupos:
+        grupos[chave] = {
+            "qtde": 0,
+            "comp_total": 0.0,
+            "fator_peso": fator_peso
+        }
+    grupos[chave]["qtde"] += qtde
+    grupos[chave]["comp_total"] += comprimento_m
+
+
+def _resumir_volume(cache, membro, resumo):
+    param_volume = cache.get_instance_parameter(membro, VOLUMEUNITARIO)
+    volume_m3 = 0
+    if param_volume:
+        try:
+            volume_ft3 = param_volume.AsDouble()
+            volume_m3 = volume_ft3 * 0.028316846592
+        except:
+            volume_m3 = 0
+    if volume_m3 <= 0:
+        return
+    # Volume somado ao da peça principal quando o FCK do tipo é o mesmo
+    element_type = cache.get_type(membro)
+    if element_type:
+        param_fck = cache.get_instance_parameter(element_type, CLASSECONCRETO)
+        if param_fck:
+            resumo["volumes"].append((membro.Id.IntegerValue, param_fck.AsValueString(), volume_m3))
+    # Complemento estrutural
+    fck = parameter_get(cache, membro, CLASSECONCRETO)
+    produto = parameter_get(cache, membro, TIPOPRODUTO)
+    if fck and produto:
+        grupo_param = cache.get_parameter(membro, GRUPO)
+        grupo_val = grupo_param.AsValueString() if grupo_param else ""
+        if grupo_val == "COMPLEMENTO ESTRUTURAL":
+            resumo["estruturais"].append((membro.Id.IntegerValue, produto))
+
+
+def _resumir_acessorio(cache, membro, resumo):
+    param_desc = cache.get_parameter(membro, "ERP. DESCRIÇÃO")
+    if not param_desc:
+        return
+    desc = param_desc.AsValueString()
+    if not desc:
+        return
+    # Filtro 1: verificar "ERP. ETAPA"
+    etapas_validas = ["ARMAÇÃO", "CONCRETAGEM", "ACABAMENTO"]
+    param_etapa = cache.get_parameter(membro, "ERP. ETAPA")
+    if not param_etapa:
+        return
+    etapa = param_etapa.AsValueString()
+    if not etapa or etapa.upper() not in etapas_validas:
+        return
+    # Filtro 2: verificar "ERP. CÓDIGO da FAMÍLIA"
+    param_item = cache.get_parameter(membro, "ERP. CÓDIGO da FAMÍLIA")
+    if not param_item:
+        return
+    item = param_item.AsValueString()
+    if not item or item.upper() == "NÃO CONTABILIZAR":
+        return
+    param_comp = cache.get_parameter(membro, "_COMPRIMENTO")
+    param_unid = cache.get_parameter(membro, "ERP. UNIDADE")
+    if not param_unid:
+        return
+    unid = param_unid.AsValueString()
+    comprimento_val = None
+    if param_comp:
+        try:
+            if param_comp.StorageType == StorageType.Double:
+                comprimento_val = UnitUtils.ConvertFromInternalUnits(
+                    param_comp.AsDouble(),
+                    UnitTypeId.Meters
+                )
+            else:
+                comp_str = param_comp.AsValueString()
+                if comp_str:
+                    comprimento_val = float(comp_str.replace(",", "."))
+        except:
+            comprimento_val = None
+    resumo["acessorios"].append((membro.Id.IntegerValue, (item, desc, unid, comprimento_val)))
+
+
+def summarize_assembly(cache, assembly, _name=None):
+    """Resumo da montagem em uma única passada pelos membros.
+
+    - volumes: (id, FCK do tipo, volume em m³) dos membros com volume
+    - aco: posições de vergalhões {(pos, produto, tipo, bitola): valores}
+    - telas: massa das telas soldadas {(tipo, bitola): kg}
+    - estruturais: (id, produto) dos complementos estruturais
+    - acessorios: (id, (item, desc, unid, comprimento)) dos acessórios do ERP
+
+    As listas guardam o id do membro para que cada consumidor desconsidere a
+    própria peça principal.
+    """
+    resumo = {"volumes": [], "aco": {}, "telas": {}, "estruturais": [], "acessorios": []}
+    for mid in assembly.GetMemberIds():
+        membro = cache.doc.GetElement(mid)
+        if not membro or not membro.Category:
+            continue
+        _resumir_aco(cache, membro, membro.Category.Id.IntegerValue, resumo)
+        _resumir_volume(cache, membro, resumo)
+        _resumir_acessorio(cache, membro, resumo)
+    return resumo
+
+
+def get_assembly(cache, element):
+    if element.AssemblyInstanceId == ElementId.InvalidElementId:
+        return None
+    assembly = cache.doc.GetElement(element.AssemblyInstanceId)
+    if not isinstance(assembly, AssemblyInstance):
+        return None
+    return assembly
+
+
+def get_assembly_summary(cache, element):
+    """Resumo da montagem do elemento (calculado uma vez por montagem), ou None."""
+    assembly = get_assembly(cache, element)
+    if assembly is None:
+        return None
+    return cache.get_value(assembly, RESUMO_MONTAGEM, summarize_assembly, persistent=True)
+
+
+def build_tabela_aco_xml(cache, escaper, element):
+    resumo = get_assembly_summary(cache, element)
+    if resumo is None:
+        return ""
+
+    def natural_key(text):
+        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', text)]
+
+    grupos = resumo["aco"]
+    telas = resumo["telas"]
+    nome_peca = get_nome_peca(cache, element)
+    xml_posicoes = []
+    for chave in sorted(grupos.keys(), key=lambda x: natural_key(x[0])):
+        posicao, produto, tipo, bitola = chave
+        valores = grupos[chave]
+        comp_total_original = valores["comp_total"]
+        fator_peso = valores.get("fator_peso")
+        if fator_peso is None:
+            comp_total_fatorado = comp_total_original
+        else:
+            comp_total_fatorado = comp_total_original * fator_peso
+        xml_posicoes.append((
+            "\t\t\t<POSICAO>\n"
+            "\t\t\t\t<POS>{}</POS>\n"
+            "\t\t\t\t<PRODUTO>{}</PRODUTO>\n"
+            "\t\t\t\t<TIPO>{}</TIPO>\n"
+            "\t\t\t\t<BITOLA>{}</BITOLA>\n"
+            "\t\t\t\t<QTDE>{}</QTDE>\n"
+            "\t\t\t\t<COMP_TOTAL>{:.3f}</COMP_TOTAL>\n"
+            "\t\t\t</POSICAO>\n"
+        ).format(
+            escaper.escape(posicao, "POS", nome_peca),
+            produto,
+            escaper.escape(tipo, "TIPO", nome_peca),
+            escaper.escape(bitola, "BITOLA", nome_peca),
+            valores["qtde"],
+            comp_total_fatorado
+        ))
+    contador_tela = 1
+    for chave, peso_total in telas.items():
+        tipo, bitola = chave
+        posicao = "T{}".format(contador_tela)
+        xml_posicoes.append((
+            "\t\t\t<POSICAO>\n"
+            "\t\t\t\t<POS>{}</POS>\n"
+            "\t\t\t\t<PRODUTO>ACO</PRODUTO>\n"
+            "\t\t\t\t<TIPO>{}</TIPO>\n"
+            "\t\t\t\t<BITOLA>{}</BITOLA>\n"
+            "\t\t\t\t<QTDE>1</QTDE>\n"
+            "\t\t\t\t<COMP_TOTAL>{:.3f}</COMP_TOTAL>\n"
+            "\t\t\t</POSICAO>\n"
+        ).format(
+            posicao,
+            escaper.escape(tipo, "TIPO", nome_peca),
+            escaper.escape(bitola, "BITOLA", nome_peca),
+            peso_total
+        ))
+        contador_tela += 1
+    return xml_posicoes
+
+
+def build_complementos_xml(cache, escaper, element):
+    resumo = get_assembly_summary(cache, element)
+    if resumo is None:
+        return ""
+    proprio_id = element.Id.IntegerValue
+    grupos_estruturais = {}
+    grupos_acessorios = {}
+    for membro_id, chave in resumo["estruturais"]:
+        if membro_id == proprio_id:
+            continue
+        if chave not in grupos_estruturais:
+            grupos_estruturais[chave] = 0
+        grupos_estruturais[chave] += 1
+    for membro_id, chave in resumo["acessorios"]:
+        if membro_id == proprio_id:
+            continue
+        if chave not in grupos_acessorios:
+            grupos_acessorios[chave] = 0
+        grupos_acessorios[chave] += 1
+    nome_peca = get_nome_peca(cache, element)
+    xml_complementos = []
+    estruturais_ordenados = sorted(grupos_estruturais.keys(), key=lambda x: x.lower())
+    for produto in estruturais_ordenados:
+        qtde = grupos_estruturais[produto]
+        item = str(element.Id.IntegerValue)
+        desc = produto
+        unid = "UN"
+        xml_complementos.append((
+            "\t\t\t<ACESSORIO>\n"
+            "\t\t\t\t<ITEM>{}</ITEM>\n"
+            "\t\t\t\t<DESC>{}</DESC>\n"
+            "\t\t\t\t<QTDE>{}</QTDE>\n"
+            "\t\t\t\t<UNID>{}</UNID>\n"
+            "\t\t\t</ACESSORIO>\n"
+        ).format(item, escaper.escape(desc, "DESC", nome_peca), qtde, unid))
+    acessorios_ordenados = sorted(
+        grupos_acessorios.keys(),
+        key=lambda x: x[1].lower()
+    )
+    for chave in acessorios_ordenados:
+        item, desc, unid, comprimento_val = chave
+        qtde = grupos_acessorios[chave]
+        if comprimento_val is not None:
+            qtde_final = float(comprimento_val) * float(qtde)
+            qtde_str = "{:.3f}".format(qtde_final)
+        else:
+            qtde_str = str(qtde)
+        xml_complementos.append((
+            "\t\t\t<ACESSORIO>\n"
+            "\t\t\t\t<ITEM>{}</ITEM>\n"
+            "\t\t\t\t<DESC>{}</DESC>\n"
+            "\t\t\t\t<QTDE>{}</QTDE>\n"
+            "\t\t\t\t<UNID>{}</UNID>\n"
+            "\t\t\t</ACESSORIO>\n"
+        ).format(
+            escaper.escape(item, "ITEM", nome_peca),
+            escaper.escape(desc, "DESC", nome_peca),
+            qtde_str,
+            escaper.escape(unid, "UNID", nome_peca)
+        ))
+    return xml_complementos
+
+
+def xml_unit_data(cache, escaper, selected_element, grupo, desenhos_pdf=None):
+    """Conteúdo de uma PECA: (campos, ids, tabelaaco, complementos), com `campos` em pares (tag, valor)."""
+    quantidade = grupo["quantidade"]
+    ids = grupo["ids"]
+    nomepeca = get_nome_peca(cache, selected_element)
+    codcontrole = parameter_get(cache, selected_element, CODCONTROLE)
+    if desenhos_pdf:
+        desenho = ";".join(desenhos_pdf)
+    else:
+        desenho = parameter_get(cache, selected_element, DESENHO)
+    tipoproduto = parameter_get(cache, selected_element, TIPOPRODUTO)
+    grupo_nome = parameter_get(cache, selected_element, GRUPO)
+    secao = parameter_get(cache, selected_element, SECAO)
+    infoadicional = parameter_get(cache, selected_element, INFOADICIONAL)
+    media_comprimento = grupo["soma_comprimento"] / quantidade if quantidade else 0
+    media_altura = grupo["soma_altura"] / quantidade if quantidade else 0
+    media_largura = grupo["soma_largura"] / quantidade if quantidade else 0
+    media_volume = grupo["soma_volume"] / quantidade if quantidade else 0
+    classeconcreto = grupo.get("classeconcreto", "")
+    acabamento = grupo.get("acabamento", "")
+    cobrimento = grupo.get("cobrimento", "")
+    obs = grupo.get("obs", "")
+    tabelaaco = build_tabela_aco_xml(cache, escaper, selected_element)
+    complementos = build_complementos_xml(cache, escaper, selected_element)
+    altura_m = media_altura / 100.0
+    largura_m = media_largura / 100.0
+    comprimento = "{:.3f}".format(media_comprimento)
+    altura = "{:.3f}".format(altura_m)
+    largura = "{:.3f}".format(largura_m)
+    volumeunitario = "{:.3f}".format(media_volume)
+    peso_valor = media_volume * 2500
+    peso = "{:.3f}".format(peso_valor)
+    area_valor = altura_m * largura_m
+    area = "{:.3f}".format(area_valor)
+    campos = [
+        ("NOMEPECA", nomepeca),
+        ("CODCONTROLE", codcontrole),
+        ("DESENHO", desenho),
+        ("TIPOPRODUTO", tipoproduto),
+        ("GRUPO", grupo_nome),
+        ("SECAO", secao),
+        ("INFOADICIONAL", infoadicional),
+        ("QUANTIDADE", "{}".format(quantidade)),
+        ("COMPRIMENTO", comprimento),
+        ("ALTURA", altura),
+        ("LARGURA", largura),
+        ("VOLUMEUNITARIO", volumeunitario),
+        ("PESO", peso),
+        ("AREA", area),
+        ("CLASSECONCRETO", classeconcreto),
+        ("ACABAMENTO", acabamento),
+        ("COBRIMENTO", cobrimento),
+        ("OBS", obs),
+    ]
+    return campos, ids, tabelaaco, complementos
+
+
+def xml_unit_parts(escaper, unidade):
+    """Partes do bloco <PECA> de uma unidade de `xml_unit_data`."""
+    campos, ids, tabelaaco, complementos = unidade
+    nomepeca = dict(campos)["NOMEPECA"]
+    partes = ["\t<PECA>\n"]
+    for tag, valor in campos:
+        partes.extend(("\t\t<", tag, ">", escaper.escape(valor, tag, nomepeca), "</", tag, ">\n"))
+    partes.append("\t\t<LISTAID>\n")
+    for uid in ids:
+        partes.extend(("\t\t\t<ID>", uid, "</ID>\n"))
+    partes.append("\t\t</LISTAID>\n")
+    partes.append("\t\t<TABELAACO>\n")
+    partes.extend(tabelaaco)
+    partes.append("\t\t</TABELAACO>\n")
+    partes.append("\t\t<COMPLEMENTOS>\n")
+    partes.extend(complementos)
+    partes.append("\t\t</COMPLEMENTOS>\n")
+    partes.append("\t</PECA>\n")
+    return partes
+
+
+def xml_unit_build(cache, escaper, selected_element, grupo, desenhos_pdf=None):
+    return xml_unit_parts(escaper, xml_unit_data(cache, escaper, selected_element, grupo, desenhos_pdf))
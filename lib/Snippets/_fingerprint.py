@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Impressão digital das peças exportadas, para reexportar só o que mudou.
+
+A impressão é o hash do conteúdo de `xml_unit_data`, campo a campo pelo nome
+da tag, sem o DESENHO (os nomes dos PDFs dependem da própria exportação):
+cobre os demais campos, a LISTAID, a tabela de aço e os complementos. Fica
+gravada em JSON por UniqueId, em um arquivo ao lado do modelo.
+"""
+
+# IMPORTS
+import hashlib
+from Snippets._export import xml_unit_data
+from Snippets._utils import load_json, save_json
+from Snippets._xmlwriter import XmlEscaper
+
+
+# CAMPOS QUE NÃO ENTRAM NA IMPRESSÃO
+campos_ignorados = set(["DESENHO"])
+
+
+# FUNCTIONS
+def _update(h, texto):
+    if isinstance(texto, type(u"")):
+        texto = texto.encode("utf-8")
+    h.update(texto)
+
+
+def unit_fingerprint(unidade):
+    """Hash de uma unidade de `xml_unit_data`, com cada campo identificado pela tag."""
+    campos, ids, tabelaaco, complementos = unidade
+    h = hashlib.sha1()
+    for tag, valor in campos:
+        if tag in campos_ignorados:
+            continue
+        _update(h, u"{}={}\n".format(tag, valor))
+    for secao, partes in (("LISTAID", ids), ("TABELAACO", tabelaaco), ("COMPLEMENTOS", complementos)):
+        _update(h, u"[{}]\n".format(secao))
+        for parte in partes:
+            _update(h, parte)
+            _update(h, u"\n")
+    return h.hexdigest()
+
+
+def piece_fingerprint(cache, grupo):
+    """Impressão de um grupo antes da exportação (sem os nomes dos PDFs)."""
+    return unit_fingerprint(xml_unit_data(cache, XmlEscaper(), grupo["elemento_base"], grupo))
+
+
+# CLASSES
+class ExportFingerprints(object):
+    """Impressões da última exportação de cada peça, por UniqueId.
+
+    Um grupo é considerado alterado quando qualquer uma das suas instâncias
+    não tem impressão gravada ou tem uma diferente da atual; como a LISTAID
+    entra no hash, incluir ou retirar uma instância do grupo também conta.
+
+    O arquivo é compartilhado por quem exporta o mesmo modelo; `save` relê o
+    arquivo e grava por cima dele só as impressões alteradas nesta execução,
+    para não desfazer as exportações feitas por outros nesse meio tempo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pecas = self._load()
+        self._alteradas = {}
+
+    def _load(self):
+        return load_json(self.path, lambda dados: dict(dados.get("pecas", {}))) or {}
+
+    def changed(self, grupo, fingerprint):
+        return any(self._pecas.get(uid) != fingerprint for uid in grupo["ids"])
+
+    def update(self, grupo, fingerprint):
+        for uid in grupo["ids"]:
+            if self._pecas.get(uid) != fingerprint:
+                self._pecas[uid] = fingerprint
+                self._alteradas[uid] = fingerprint
+
+    def save(self):
+        if not self._alteradas:
+            return
+        pecas = self._load()
+        pecas.update(self._alteradas)
+        if save_json(self.path, {"pecas": pecas}):
+            self._pecas = pecas
+            self._alteradas = {}
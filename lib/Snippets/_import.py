@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""Leitura do XML do Plannix e gravação de código de controle, status e data nas peças."""
+
+# IMPORTS
+import xml.etree.ElementTree as ET
+from Snippets._colors import categorias_interesse
+from Snippets._revitapi import (
+    BuiltInCategory,
+    ElementId,
+    ElementMulticategoryFilter,
+    FilteredElementCollector,
+    List,
+    StorageType,
+    Transaction,
+    TransactionGroup,
+    WorksharingUtils,
+)
+from Snippets._status import PARAM_STATUS, translate_status
+
+# PARAM NAMES
+PARAM_CODCONTROLE = "16. CÓDIGO DE CONTROLE"
+PARAM_DATA        = "19. DATA DO STATUS"
+
+
+# CLASSES
+class CentralInacessivelError(Exception):
+    """O modelo central não respondeu ao checkout; nada foi gravado."""
+
+
+# FUNCTIONS
+def _peca_guids(peca):
+    """GUIDs da PECA: o ID direto e todos os ID da LISTAID, sem repetição."""
+    guids = []
+    for elem in [peca.find("ID")] + peca.findall("LISTAID/ID"):
+        if elem is None:
+            continue
+        guid = (elem.text or "").strip()
+        if guid and guid not in guids:
+            guids.append(guid)
+    return tuple(guids)
+
+
+def _peca_record(peca):
+    status_raw = (peca.findtext("STATUS") or "").strip()
+    return (
+        (peca.findtext("NOMEPECA")    or "").strip(),
+        _peca_guids(peca),
+        (peca.findtext("CODCONTROLE") or "").strip(),
+        translate_status(status_raw),
+        (peca.findtext("DATA")        or "").strip(),
+    )
+
+
+def iter_pecas(xml_path):
+    """Lê o XML em fluxo e gera uma tupla (nomepeca, guids, codcontrole, status, data) por PECA.
+
+    Cada PECA é descartada da árvore logo após ser lida, então a memória usada
+    não cresce com o tamanho do arquivo.
+    """
+    contexto = iter(ET.iterparse(xml_path, events=("start", "end")))
+    event, root = next(contexto)
+    for event, elem in contexto:
+        if event != "end" or elem.tag != "PECA":
+            continue
+        yield _peca_record(elem)
+        root.clear()
+
+
+def read_pecas(xml_path):
+    return list(iter_pecas(xml_path))
+
+
+def batched(iterable, size):
+    lote = []
+    for item in iterable:
+        lote.append(item)
+        if len(lote) >= size:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def set_parameter(element, param_name, value, nomepeca, guid, label):
+    param = element.LookupParameter(param_name)
+    if not param:
+        print(
+            "O parâmetro para inserir a informação de {} não foi encontrado na peça '{}' de GUID {}.".format(
+                label, nomepeca, guid
+            )
+        )
+        return False
+    try:
+        param.Set(value)
+        return True
+    except Exception as e:
+        print(
+            "Erro ao definir '{}' na peça '{}' de GUID {}: {}".format(
+                param_name, nomepeca, guid, str(e)
+            )
+        )
+        return False
+
+
+def is_central_error(error):
+    error_msg = str(error).lower()
+    return "central" in error_msg or "network" in error_msg or "reached" in error_msg or "server" in error_msg
+
+
+def new_counts():
+    return {
+        "atualizadas": 0,
+        "inalteradas": 0,
+        "nao_encontradas": 0,
+        "erros": 0,
+        "ignoradas": 0,
+    }
+
+
+def current_value(element, param_name):
+    """Valor atual do parâmetro como texto, ou None se o parâmetro não existir."""
+    param = element.LookupParameter(param_name)
+    if not param:
+        return None
+    if param.StorageType == StorageType.String:
+        return param.AsString() or ""
+    return param.AsValueString() or ""
+
+
+def needs_update(element, cod, status, data):
+    for param_name, novo in ((PARAM_CODCONTROLE, cod), (PARAM_STATUS, status), (PARAM_DATA, data)):
+        atual = current_value(element, param_name)
+        if atual is None or atual != novo:
+            return True
+    return False
+
+
+def build_guid_index(doc):
+    """UniqueId → ElementId das peças das categorias de interesse, em uma única passada."""
+    filtro = ElementMulticategoryFilter(List[BuiltInCategory](categorias_interesse))
+    collector = FilteredElementCollector(doc).WherePasses(filtro).WhereElementIsNotElementType()
+    return dict((element.UniqueId, element.Id) for element in collector)
+
+
+def find_element(doc, guid_index, guid):
+    element_id = guid_index.get(guid)
+    if element_id is not None:
+        return doc.GetElement(element_id)
+    # Peça fora das categorias de interesse
+    return doc.GetElement(guid)
+
+
+def resolve_pecas(doc, guid_index, pecas, contagem, faltando, only_changed=False):
+    """Localiza os elementos de todos os GUIDs de cada peça e retorna os alvos a gravar.
+
+    Cada alvo é ((nomepeca, guid, cod, status, data), elemento), um por
+    instância da peça. GUIDs sem elemento são acrescentados a `faltando`. Com
+    `only_changed`, instâncias cujos três parâmetros já têm os valores do XML
+    são contadas como inalteradas e ficam fora do checkout e da transação.
+    """
+    alvos = []
+    for nomepeca, guids, cod, status, data in pecas:
+
+        # Sem ID → pular silenciosamente
+        if not guids:
+            contagem["ignoradas"] += 1
+            continue
+
+        for guid in guids:
+            element = find_element(doc, guid_index, guid)
+            if not element:
+                faltando.append((nomepeca, guid))
+                contagem["nao_encontradas"] += 1
+                continue
+
+            if only_changed and not needs_update(element, cod, status, data):
+                contagem["inalteradas"] += 1
+                continue
+            alvos.append(((nomepeca, guid, cod, status, data), element))
+    return alvos
+
+
+def report_nao_encontradas(faltando):
+    if not faltando:
+        return
+    por_peca = {}
+    for nomepeca, guid in faltando:
+        por_peca.setdefault(nomepeca, []).append(guid)
+    print("Peças do XML não encontradas no modelo e desconsideradas na execução:")
+    for nomepeca in sorted(por_peca):
+        guids = por_peca[nomepeca]
+        exemplos = ", ".join(guids[:3]) + (", ..." if len(guids) > 3 else "")
+        print("  {}: {} GUID(s) - {}".format(nomepeca or "(sem nome)", len(guids), exemplos))
+
+
+def get_owner(doc, element_id):
+    try:
+        return WorksharingUtils.GetWorksharingTooltipInfo(doc, element_id).Owner or "desconhecido"
+    except Exception:
+        return "desconhecido"
+
+
+def checkout_pecas(doc, alvos):
+    """Faz o checkout de todos os alvos em uma única chamada ao central.
+
+    Retorna (liberados, recusados), onde recusados é um dicionário
+    proprietário -> lista de nomes das peças. Lança CentralInacessivelError
+    se o central não responder.
+    """
+    if not doc.IsWorkshared or not alvos:
+        return alvos, {}
+    ids = List[ElementId]()
+    for peca, element in alvos:
+        ids.Add(element.Id)
+    try:
+        obtidos = WorksharingUtils.CheckoutElements(doc, ids)
+    except Exception as e:
+        if is_central_error(e):
+            raise CentralInacessivelError(str(e))
+        raise
+    obtidos = set(eid.IntegerValue for eid in obtidos)
+    liberados = []
+    recusados = {}
+    for peca, element in alvos:
+        if element.Id.IntegerValue in obtidos:
+            liberados.append((peca, element))
+        else:
+            recusados.setdefault(get_owner(doc, element.Id), []).append(peca[0])
+    return liberados, recusados
+
+
+def report_recusados(recusados):
+    if not recusados:
+        return
+    print("Peças que não puderam ser reservadas para edição (checkout), por proprietário:")
+    for owner in sorted(recusados):
+        nomes = sorted(recusados[owner])
+        exemplos = ", ".join(nomes[:10]) + (", ..." if len(nomes) > 10 else "")
+        print("  {}: {} peça(s) - {}".format(owner, len(nomes), exemplos))
+
+
+def import_pecas(doc, pecas, batch_size=500, only_changed=False):
+    """Grava as peças de `iter_pecas`/`read_pecas` e retorna as contagens de `new_counts`.
+
+    As contagens são por instância: uma PECA agrupada atualiza todos os
+    elementos da sua LISTAID. Os GUIDs são resolvidos por um índice
+    UniqueId → ElementId montado uma vez, com as peças consumidas em lotes de
+    `batch_size`; instâncias sem alteração são descartadas (`only_changed`).
+    Só os alvos resolvidos ficam em memória: o checkout de todos eles é feito
+    em uma única chamada ao central antes de qualquer gravação, de modo que um
+    central inacessível interrompe a importação sem nada gravado. Os
+    parâmetros são então gravados em uma transação por lote, reunidas em um
+    único grupo, desfeito por completo em caso de erro.
+    """
+    contagem = new_counts()
+    faltando = []
+    guid_index = build_guid_index(doc)
+    alvos = []
+    for lote in batched(pecas, batch_size):
+        alvos.extend(resolve_pecas(doc, guid_index, lote, contagem, faltando, only_changed))
+    liberados, recusados = checkout_pecas(doc, alvos)
+    report_recusados(recusados)
+    contagem["erros"] += len(alvos) - len(liberados)
+    with TransactionGroup(doc, "Importar XML Plannix") as tg:
+        tg.Start()
+        try:
+            for lote in batched(liberados, batch_size):
+                with Transaction(doc, "Importar XML Plannix") as t:
+                    t.Start()
+                    for (nomepeca, guid, cod, status, data), element in lote:
+                        ok_cod    = set_parameter(element, PARAM_CODCONTROLE, cod,    nomepeca, guid, "código de controle")
+                        ok_status = set_parameter(element, PARAM_STATUS,      status, nomepeca, guid, "status da peça")
+                        ok_data   = set_parameter(element, PARAM_DATA,        data,   nomepeca, guid, "data do status")
+
+                        if ok_cod and ok_status and ok_data:
+                            contagem["atualizadas"] += 1
+                        else:
+                            contagem["erros"] += 1
+
+                    t.Commit()
+        except:
+            tg.RollBack()
+            raise
+        tg.Assimilate()
+    report_nao_encontradas(faltando)
+    return contagem
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Busca de parâmetros do projeto por nome, compartilhada entre a exportação e a coloração."""
+
+# IMPORTS
+from Snippets._revitapi import FilteredElementCollector, ParameterElement
+
+
+# CLASSES
+class ParametroAusenteError(Exception):
+    pass
+
+
+# FUNCTIONS
+def find_parameter_ids(doc, param_names):
+    """Ids dos parâmetros por nome, com uma única passada pelos ParameterElement.
+
+    Levanta ParametroAusenteError com o primeiro nome que não existir no documento.
+    """
+    procurados = set(param_names)
+    ids = {}
+    for param_elem in FilteredElementCollector(doc).OfClass(ParameterElement):
+        nome = param_elem.GetDefinition().Name
+        if nome in procurados and nome not in ids:
+            ids[nome] = param_elem.Id
+            if len(ids) == len(procurados):
+                break
+    for param_name in param_names:
+        if param_name not in ids:
+            raise ParametroAusenteError(param_name)
+    return ids
+
+
+def find_parameter_id(doc, param_name):
+    return find_parameter_ids(doc, [param_name])[param_name]
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""Ponto único de importação da API do Revit para os módulos de `Snippets`.
+
+Dentro do Revit expõe `Autodesk.Revit.DB` e `List` do .NET. O substituto em
+memória `benchmarks/fakerevit.py` só é usado quando pedido explicitamente pela
+variável de ambiente PLANNIX_FAKE_REVIT (benchmarks); fora disso, uma falha ao
+importar a API é propagada em vez de ser mascarada.
+"""
+
+import os
+
+HEADLESS = bool(os.environ.get("PLANNIX_FAKE_REVIT"))
+
+if HEADLESS:
+    from fakerevit import *
+else:
+    import clr
+    clr.AddReference("System")
+    from System.Collections.Generic import List
+    from Autodesk.Revit.DB import *
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Índice das folhas do documento por "Tema da Vista"."""
+
+# IMPORTS
+import os
+import re
+from collections import namedtuple
+from Snippets._revitapi import (
+    BuiltInCategory,
+    BuiltInParameter,
+    ElementId,
+    FilteredElementCollector,
+    List,
+    PDFExportOptions,
+    TableCellCombinedParameterData,
+    ViewSheet,
+)
+from Snippets._utils import natural_key
+
+# PARAM NAMES
+PARAM_TEMA   = "Tema da Vista"
+PARAM_NUMERO = "Número da folha"
+PARAM_NOME   = "Nome da folha"
+
+Folha = namedtuple("Folha", ["numero", "tema", "nome", "sheet", "base_name"])
+
+
+# FUNCTIONS
+def normalize_tema(text):
+    if not text:
+        return ""
+    return " ".join(text.split()).lower()
+
+
+def revit_file_name(text):
+    """Nome de arquivo como a regra de nomes do Revit o grava: caracteres inválidos viram "_"."""
+    return re.sub(r'[\\/*?:"<>|]', "_", text or "")
+
+
+def _value_string(element, param_name):
+    param = element.LookupParameter(param_name)
+    if not param:
+        return ""
+    return param.AsValueString() or ""
+
+
+# CLASSES
+class SheetIndex(object):
+    """Percorre as folhas uma única vez e as agrupa por tema, já ordenadas pelo número."""
+
+    def __init__(self, doc):
+        self._folhas = {}
+        self.tema_param_id = None
+        for sheet in FilteredElementCollector(doc).OfClass(ViewSheet):
+            param_tema = sheet.LookupParameter(PARAM_TEMA)
+            if not param_tema:
+                continue
+            if self.tema_param_id is None:
+                self.tema_param_id = param_tema.Id
+            tema = param_tema.AsValueString()
+            if not tema:
+                continue
+            numero = _value_string(sheet, PARAM_NUMERO)
+            if not numero:
+                continue
+            nome = _value_string(sheet, PARAM_NOME)
+            base_name = revit_file_name("{} - {}".format(tema, nome))
+            folha = Folha(numero, tema, nome, sheet, base_name)
+            self._folhas.setdefault(normalize_tema(tema), []).append(folha)
+        for folhas in self._folhas.values():
+            folhas.sort(key=lambda f: natural_key(f.numero))
+
+    def __len__(self):
+        return sum(len(folhas) for folhas in self._folhas.values())
+
+    def get(self, nome_peca):
+        return self._folhas.get(normalize_tema(nome_peca), [])
+
+    def pdf_names(self, nome_peca):
+        return [folha.base_name + ".pdf" for folha in self.get(nome_peca)]
+
+
+def _naming_rule(tema_param_id):
+    """Regra de nomes "<Tema da Vista> - <Nome da folha>" aplicada pelo próprio Revit.
+
+    Prefixo e separador são definidos explicitamente: o separador padrão do
+    Revit seria inserido entre os campos e mudaria o nome esperado.
+    """
+    categoria_id = ElementId(BuiltInCategory.OST_Sheets)
+    campo_tema = TableCellCombinedParameterData.Create()
+    campo_tema.CategoryId = categoria_id
+    campo_tema.ParamId = tema_param_id
+    campo_tema.Prefix = ""
+    campo_tema.Suffix = " - "
+    campo_tema.Separator = ""
+    campo_nome = TableCellCombinedParameterData.Create()
+    campo_nome.CategoryId = categoria_id
+    campo_nome.ParamId = ElementId(BuiltInParameter.SHEET_NAME)
+    campo_nome.Prefix = ""
+    campo_nome.Suffix = ""
+    campo_nome.Separator = ""
+    regra = List[TableCellCombinedParameterData]()
+    regra.Add(campo_tema)
+    regra.Add(campo_nome)
+    return regra
+
+
+def _unique_name(directory_path, base_name, reservados):
+    counter = 1
+    while True:
+        name = "{} ({}).pdf".format(base_name, counter)
+        if name.lower() not in reservados and not os.path.exists(os.path.join(directory_path, name)):
+            return name
+        counter += 1
+
+
+def check_pdf_names(directory_path, plano):
+    """Confere no diretório o arquivo esperado de cada folha do plano.
+
+    Retorna o dicionário id da folha -> nome do PDF, com None (e um aviso) nas
+    folhas cujo arquivo não foi gerado.
+    """
+    nomes = {}
+    for folha, name, no_lote in plano:
+        if os.path.exists(os.path.join(directory_path, name)):
+            nomes[folha.sheet.Id.IntegerValue] = name
+        else:
+            print(
+                "ERRO: o PDF '{}' da folha '{}' não foi gerado e não será incluído no XML."
+                .format(name, folha.numero)
+            )
+            nomes[folha.sheet.Id.IntegerValue] = None
+    return nomes
+
+
+def plan_pdf_names(folhas, directory_path, sobrescrever):
+    """Define o nome final de cada PDF antes da exportação.
+
+    Retorna a lista de (folha, nome do arquivo, exportar no lote?). Folhas cujo
+    nome padrão já está ocupado e não pode ser sobrescrito recebem um sufixo
+    numerado e são exportadas individualmente com o nome explícito.
+    """
+    plano = []
+    reservados = set()
+    for folha in folhas:
+        name = folha.base_name + ".pdf"
+        path = os.path.join(directory_path, name)
+        no_lote = name.lower() not in reservados
+        if no_lote and os.path.exists(path):
+            if sobrescrever:
+                try:
+                    os.remove(path)
+                except:
+                    no_lote = False
+            else:
+                no_lote = False
+        if not no_lote:
+            name = _unique_name(directory_path, folha.base_name, reservados)
+        reservados.add(name.lower())
+        plano.append((folha, name, no_lote))
+    return plano
+
+
+def export_sheets_batch(doc, folhas, directory_path, sobrescrever, tema_param_id):
+    """Exporta as folhas em uma única chamada com nomes definidos pelas opções.
+
+    Retorna um dicionário id da folha -> nome do PDF gerado, ou None quando o
+    arquivo não foi encontrado após a exportação.
+    """
+    plano = plan_pdf_names(folhas, directory_path, sobrescrever)
+    lote = List[ElementId]()
+    for folha, name, no_lote in plano:
+        if no_lote:
+            lote.Add(folha.sheet.Id)
+    if lote.Count:
+        options = PDFExportOptions()
+        options.Combine = False
+        options.HideCropBoundaries = False
+        options.SetNamingRule(_naming_rule(tema_param_id))
+        doc.Export(directory_path, lote, options)
+    for folha, name, no_lote in plano:
+        if no_lote:
+            continue
+        options = PDFExportOptions()
+        options.Combine = True
+        options.HideCropBoundaries = False
+        options.FileName = os.path.splitext(name)[0]
+        doc.Export(directory_path, List[ElementId]([folha.sheet.Id]), options)
+    return check_pdf_names(directory_path, plano)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Status das peças: tradução Plannix → Revit e paletas de cores da coloração.
+
+As cores são tuplas RGB para que o mapeamento não dependa de `Autodesk.Revit.DB.Color`;
+os scripts convertem para `Color` na hora de aplicar.
+"""
+
+# IMPORTS
+from Snippets._utils import fold_text
+
+# PARAM NAMES
+PARAM_STATUS    = "18. STATUS DA PEÇA"
+PARAM_EXPORTADO = "20. EXPORTADO?"
+PARAM_REVISOES  = "21. NÚMERO DE REVISÕES"
+
+# STATUS REVIT
+statuspj = "Projetada"
+statuspg = "Programada"
+statuscd = "Corte e Dobra Realizado"
+statusar = "Armação Realizada"
+statusfo = "Forma Realizada"
+statusfa = "Forma com Armação Realizada"
+statusco = "Concretagem Realizada"
+statuspr = "Preparação Realizada"
+statusct = "Corte Realizado"
+statuspm = "Pré-montagem Realizada"
+statusmm = "Montagem Realizada (Met.)"
+statussd = "Solda Realizada"
+statusam = "Acabamento Realizado (Met.)"
+statusjt = "Jateamento Realizado"
+statusgv = "Galvanização Realizada"
+statuspt = "Pintura Realizada"
+statusac = "Acabamento Realizado"
+statusex = "Expedida para a Obra"
+statusdv = "Devolvida pela Obra"
+statusdc = "Descarregada na Obra"
+statusmt = "Montada na Obra"
+
+# TRADUÇÃO STATUS PLANNIX → REVIT
+STATUS_MAP = {
+    "PROJETADA"       : statuspj,
+    "PROGRAMADA"      : statuspg,
+    "CORTE E DOBRA"   : statuscd,
+    "ARMAÇÃO"         : statusar,
+    "FORMA"           : statusfo,
+    "FORMA E ARMAÇÃO" : statusfa,
+    "CONCRETAGEM"     : statusco,
+    "PREPARAÇÃO"      : statuspr,
+    "CORTE"           : statusct,
+    "PRÉ MONTAGEM"    : statuspm,
+    "MONTAGEM"        : statusmm,
+    "SOLDA"           : statussd,
+    "ACABAMENTO"      : statusam,
+    "JATEAMENTO"      : statusjt,
+    "GALVANIZAÇÃO"    : statusgv,
+    "PINTURA"         : statuspt,
+    "ACABADA"         : statusac,
+    "EXPEDIDA"        : statusex,
+    "DEVOLVIDA"       : statusdv,
+    "DESCARREGADA"    : statusdc,
+    "MONTADA"         : statusmt,
+}
+
+# CORES DE STATUS
+cordf = (192, 192, 192)
+corpj = (178, 102, 255)
+corpg = (255, 102, 178)
+corcd = (255, 185, 185)
+corar = (255, 145, 145)
+corfo = (255, 105, 105)
+corfa = (255,  65,  65)
+corco = (255,   5,   5)
+corpr = (255, 205, 205)
+corct = (255, 180, 180)
+corpm = (255, 155, 155)
+cormm = (255, 130, 130)
+corsd = (255, 105, 105)
+coram = (255,  80,  80)
+corjt = (255,  55,  55)
+corgv = (255,  30,  30)
+corpt = (255,   5,   5)
+corac = (255, 178, 102)
+corex = (255, 128,   0)
+cordv = (102,   0,   0)
+cordc = (255, 255, 102)
+cormt = (102, 255, 102)
+
+# CORES DE REVISÃO
+notexp = (192, 192, 192)
+rev0   = (  0, 191, 255)
+rev1   = (  0, 250, 154)
+rev2   = (238, 238,   0)
+rev3   = (249, 178,   8)
+rev4   = (238,  44,  44)
+rev5   = (180,   0,   0)
+
+# STATUS → COR
+status_color_map = {
+    statuspj: corpj,
+    statuspg: corpg,
+    statuscd: corcd,
+    statusar: corar,
+    statusfo: corfo,
+    statusfa: corfa,
+    statusco: corco,
+    statuspr: corpr,
+    statusct: corct,
+    statuspm: corpm,
+    statusmm: cormm,
+    statussd: corsd,
+    statusam: coram,
+    statusjt: corjt,
+    statusgv: corgv,
+    statuspt: corpt,
+    statusac: corac,
+    statusex: corex,
+    statusdv: cordv,
+    statusdc: cordc,
+    statusmt: cormt,
+}
+
+# PALETAS (todas as cores que cada coloração pode aplicar)
+paleta_status   = [cordf] + sorted(set(status_color_map.values()))
+paleta_revisoes = [notexp, rev0, rev1, rev2, rev3, rev4, rev5]
+
+# STATUS NORMALIZADO → COR (sem diferença de maiúsculas, acentos ou espaços)
+status_color_index = dict((fold_text(k), c) for k, c in status_color_map.items())
+
+
+# FUNCTIONS
+def translate_status(status_plannix):
+    return STATUS_MAP.get(status_plannix.upper(), status_plannix)
+
+
+def get_color_for_status(status_value):
+    if not status_value:
+        return cordf
+    return status_color_index.get(fold_text(status_value), cordf)
+
+
+def get_color_for_revisoes(exportado, revisoes):
+    if not exportado:
+        return notexp
+    if revisoes <= 0:
+        return rev0
+    elif revisoes == 1:
+        return rev1
+    elif revisoes == 2:
+        return rev2
+    elif revisoes == 3:
+        return rev3
+    elif revisoes == 4:
+        return rev4
+    else:
+        return rev5
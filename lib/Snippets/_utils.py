@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Funções utilitárias de texto e de arquivos JSON compartilhadas entre os scripts."""
+
+# IMPORTS
+import io
+import json
+import os
+import re
+import uuid
+from Snippets._revitapi import ModelPathUtils
+try:
+    import unicodedata
+except ImportError:
+    unicodedata = None
+
+
+# FUNCTIONS
+def natural_key(text):
+    return [
+        int(part) if part.isdigit() else part.lower()
+        for part in re.split(r"(\d+)", text)
+    ]
+
+
+def sanitize_filename(text):
+    if not text:
+        return ""
+    return re.sub(r'[\\/*?:"<>|]', "", text)
+
+
+def fold_text(text):
+    """Texto em minúsculas, sem acentos e com espaços colapsados, para comparações."""
+    if not text:
+        return ""
+    if isinstance(text, bytes) and not isinstance(text, type(u"")):
+        text = text.decode("utf-8")
+    if unicodedata is not None:
+        text = u"".join(
+            c for c in unicodedata.normalize("NFKD", text)
+            if not unicodedata.combining(c)
+        )
+    return u" ".join(text.lower().split())
+
+
+def load_json(path, parse=None):
+    """Conteúdo do JSON em `path`, passado por `parse` se houver.
+
+    Devolve None se não houver caminho, se o arquivo não existir ou se ele não
+    puder ser lido ou interpretado; quem chama recomeça do zero nesses casos.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with io.open(path, "r", encoding="utf-8") as f:
+            dados = json.loads(f.read())
+        return parse(dados) if parse else dados
+    except (IOError, OSError, ValueError, TypeError, AttributeError, KeyError):
+        return None
+
+
+def _replace_file(origem, destino):
+    replace = getattr(os, "replace", None)
+    if replace is not None:
+        replace(origem, destino)
+        return
+    try:
+        os.rename(origem, destino)
+    except OSError:
+        # No Windows o rename do Python 2 não sobrescreve o destino
+        os.remove(destino)
+        os.rename(origem, destino)
+
+
+def save_json(path, dados):
+    """Grava `dados` em JSON; devolve False, sem exceção, se não houver caminho ou a escrita falhar.
+
+    O conteúdo é escrito em um arquivo temporário na mesma pasta e só então
+    substitui o arquivo, de modo que quem lê nunca encontra um JSON pela metade.
+    """
+    if not path:
+        return False
+    temporario = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    try:
+        with io.open(temporario, "w", encoding="utf-8") as f:
+            f.write(u"" + json.dumps(dados))
+        _replace_file(temporario, path)
+        return True
+    except (IOError, OSError, ValueError, TypeError):
+        if os.path.exists(temporario):
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+        return False
+
+
+def model_data_path(doc, sufixo):
+    """Arquivo `<modelo><sufixo>` ao lado do modelo, ou None se o modelo não foi salvo.
+
+    Em modelos colaborativos usa a pasta do central, que é a mesma para todas as
+    estações; se ela não for uma pasta acessível (nuvem), usa a do arquivo local.
+    """
+    caminho = doc.PathName
+    if doc.IsWorkshared:
+        try:
+            central = ModelPathUtils.ConvertModelPathToUserVisiblePath(
+                doc.GetWorksharingCentralModelPath()
+            )
+        except Exception:
+            central = None
+        if central and os.path.isdir(os.path.dirname(central)):
+            caminho = central
+    if not caminho:
+        return None
+    return os.path.splitext(caminho)[0] + sufixo
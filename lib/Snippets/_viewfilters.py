@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Coloração por filtros de vista: um ParameterFilterElement por status ou faixa de revisão.
+
+Em vez de um override por elemento, cada cor da paleta vira um filtro aplicado
+nas vistas. O custo depende da quantidade de status, não da quantidade de
+peças, e o Revit recolore sozinho quando os parâmetros mudam.
+"""
+
+# IMPORTS
+from Snippets._assemblies import categorias_principais_ids
+from Snippets._colors import (
+    MODO_REVISOES,
+    MODO_STATUS,
+    PREFIXO_FILTRO,
+    build_override_pool,
+    get_solid_fill_id,
+    remove_plannix_filters,
+)
+from Snippets._params import find_parameter_id, find_parameter_ids
+from Snippets._revitapi import (
+    ElementId,
+    ElementParameterFilter,
+    FilteredElementCollector,
+    FilterRule,
+    List,
+    ParameterFilterElement,
+    ParameterFilterRuleFactory,
+    SubTransaction,
+    Transaction,
+)
+from Snippets._status import (
+    PARAM_EXPORTADO,
+    PARAM_REVISOES,
+    PARAM_STATUS,
+    notexp,
+    paleta_revisoes,
+    paleta_status,
+    rev0,
+    rev1,
+    rev2,
+    rev3,
+    rev4,
+    rev5,
+    status_color_map,
+)
+from Snippets._views import template_controls_filters
+
+prefixos_modo = {
+    MODO_STATUS  : PREFIXO_FILTRO + "Status - ",
+    MODO_REVISOES: PREFIXO_FILTRO + "Revisões - ",
+}
+
+
+# FUNCTIONS
+def equals_text_rule(param_id, value):
+    # Revit 2023+ só aceita (id, texto); as versões anteriores exigem o argumento de maiúsculas
+    try:
+        return ParameterFilterRuleFactory.CreateEqualsRule(param_id, value)
+    except TypeError:
+        return ParameterFilterRuleFactory.CreateEqualsRule(param_id, value, False)
+
+
+def status_filter_rules(doc):
+    """(nome, regras, cor) de cada status da paleta."""
+    status_id = find_parameter_id(doc, PARAM_STATUS)
+    return [
+        (status, [equals_text_rule(status_id, status)], cor)
+        for status, cor in sorted(status_color_map.items())
+    ]
+
+
+def revisoes_filter_rules(doc):
+    """(nome, regras, cor) de cada faixa de revisão, na ordem de get_color_for_revisoes."""
+    ids = find_parameter_ids(doc, [PARAM_EXPORTADO, PARAM_REVISOES])
+    exportado_id = ids[PARAM_EXPORTADO]
+    revisoes_id = ids[PARAM_REVISOES]
+    factory = ParameterFilterRuleFactory
+
+    def exportada(*regras):
+        return [factory.CreateEqualsRule(exportado_id, 1)] + list(regras)
+
+    return [
+        ("Não exportada", [factory.CreateNotEqualsRule(exportado_id, 1)], notexp),
+        ("0", exportada(factory.CreateLessOrEqualRule(revisoes_id, 0)), rev0),
+        ("1", exportada(factory.CreateEqualsRule(revisoes_id, 1)), rev1),
+        ("2", exportada(factory.CreateEqualsRule(revisoes_id, 2)), rev2),
+        ("3", exportada(factory.CreateEqualsRule(revisoes_id, 3)), rev3),
+        ("4", exportada(factory.CreateEqualsRule(revisoes_id, 4)), rev4),
+        ("5 ou mais", exportada(factory.CreateGreaterOrEqualRule(revisoes_id, 5)), rev5),
+    ]
+
+
+filtros_modo = {
+    MODO_STATUS  : (status_filter_rules, paleta_status),
+    MODO_REVISOES: (revisoes_filter_rules, paleta_revisoes),
+}
+
+
+def apply_filter_colors(doc, views, modo, transaction_name):
+    """Cria ou atualiza os filtros do `modo` e os aplica nas vistas.
+
+    Filtros da coloração do outro modo são retirados das vistas. Overrides por
+    elemento têm precedência sobre filtros, por isso devem ser removidos antes.
+    Vistas cujo modelo de vista controla os filtros são puladas, e cada vista é
+    alterada em uma subtransação: uma vista que falhe é desfeita e informada
+    sem desfazer as demais. Retorna {"filtros", "vistas", "ignoradas"}, com
+    `ignoradas` como lista de (nome da vista, motivo).
+    """
+    build_rules, paleta = filtros_modo[modo]
+    prefixo = prefixos_modo[modo]
+    definicoes = build_rules(doc)
+    pool = build_override_pool(paleta, get_solid_fill_id(doc))
+    categorias = List[ElementId]([ElementId(c) for c in sorted(categorias_principais_ids)])
+    existentes = dict(
+        (f.Name, f) for f in FilteredElementCollector(doc).OfClass(ParameterFilterElement)
+    )
+    with Transaction(doc, transaction_name) as t:
+        t.Start()
+        filtros = []
+        resultado = {"filtros": 0, "vistas": 0, "ignoradas": []}
+        for nome, regras, cor in definicoes:
+            element_filter = ElementParameterFilter(List[FilterRule](regras))
+            nome_filtro = prefixo + nome
+            filtro = existentes.get(nome_filtro)
+            if filtro is None:
+                filtro = ParameterFilterElement.Create(doc, nome_filtro, categorias, element_filter)
+            else:
+                filtro.SetCategories(categorias)
+                filtro.SetElementFilter(element_filter)
+            filtros.append((filtro.Id, pool[cor]))
+        for view in views:
+            if template_controls_filters(doc, view):
+                resultado["ignoradas"].append((view.Name, "filtros controlados pelo modelo de vista"))
+                continue
+            st = SubTransaction(doc)
+            st.Start()
+            try:
+                remove_plannix_filters(doc, view, manter_prefixo=prefixo)
+                for filter_id, ogs in filtros:
+                    if not view.IsFilterApplied(filter_id):
+                        view.AddFilter(filter_id)
+                    view.SetFilterOverrides(filter_id, ogs)
+                    view.SetFilterVisibility(filter_id, True)
+            except Exception as e:
+                st.RollBack()
+                resultado["ignoradas"].append((view.Name, str(e)))
+                continue
+            st.Commit()
+            resultado["vistas"] += 1
+        t.Commit()
+    resultado["filtros"] = len(filtros)
+    return resultado
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Seleção das vistas coloridas em lote pelo Colorir Modelo."""
+
+# IMPORTS
+import fnmatch
+from Snippets._revitapi import (
+    BuiltInParameter,
+    ElementId,
+    FilteredElementCollector,
+    View,
+    View3D,
+)
+from Snippets._utils import natural_key
+
+
+# FUNCTIONS
+def can_color(view):
+    return view is not None and not view.IsTemplate and view.AreGraphicsOverridesAllowed()
+
+
+def template_controls_filters(doc, view):
+    """Verdadeiro se o modelo de vista aplicado controla os filtros de V/G da vista."""
+    template_id = view.ViewTemplateId
+    if template_id is None or template_id == ElementId.InvalidElementId:
+        return False
+    template = doc.GetElement(template_id)
+    if template is None:
+        return False
+    filtros_id = ElementId(BuiltInParameter.VIS_GRAPHICS_FILTERS)
+    return filtros_id not in list(template.GetNonControlledTemplateParameterIds())
+
+
+def split_filter_views(doc, views):
+    """(vistas que aceitam filtros da coloração, vistas cujos filtros são do modelo de vista)."""
+    liberadas, bloqueadas = [], []
+    for view in views:
+        (bloqueadas if template_controls_filters(doc, view) else liberadas).append(view)
+    return liberadas, bloqueadas
+
+
+def _sorted_views(views):
+    return sorted(views, key=lambda v: natural_key(v.Name))
+
+
+def all_3d_views(doc):
+    return _sorted_views(
+        v for v in FilteredElementCollector(doc).OfClass(View3D) if can_color(v)
+    )
+
+
+def views_on_sheets(doc, sheets):
+    """Vistas colocadas nas folhas, sem repetir as que aparecem em mais de uma."""
+    vistas = {}
+    for sheet in sheets:
+        for view_id in sheet.GetAllPlacedViews():
+            view = doc.GetElement(view_id)
+            if can_color(view):
+                vistas[view_id.IntegerValue] = view
+    return _sorted_views(vistas.values())
+
+
+def views_matching(doc, padrao):
+    """Vistas cujo nome casa com o padrão (curingas * e ?, sem diferenciar maiúsculas)."""
+    if not padrao:
+        return []
+    padrao = padrao.lower()
+    if "*" not in padrao and "?" not in padrao:
+        padrao = "*" + padrao + "*"
+    return _sorted_views(
+        v for v in FilteredElementCollector(doc).OfClass(View)
+        if can_color(v) and fnmatch.fnmatchcase(v.Name.lower(), padrao)
+    )
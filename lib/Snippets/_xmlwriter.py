@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Gravação em fluxo do XML de detalhamento do Plannix."""
+
+# IMPORTS
+import io
+import os
+import re
+try:
+    import unicodedata
+except ImportError:
+    unicodedata = None
+
+XML_ENCODING = "ISO-8859-1"
+XML_HEADER = '<?xml version="1.0" encoding="ISO-8859-1" ?>\n'
+
+_ESCAPES = {
+    u"&": u"&amp;",
+    u"<": u"&lt;",
+    u">": u"&gt;",
+    u'"': u"&quot;",
+    u"'": u"&apos;",
+}
+# Caracteres frequentes fora do ISO-8859-1 e o equivalente mais próximo
+_SUBSTITUTOS = {
+    u"\u2013": u"-",
+    u"\u2014": u"-",
+    u"\u2212": u"-",
+    u"\u2018": u"'",
+    u"\u2019": u"'",
+    u"\u201c": u'"',
+    u"\u201d": u'"',
+    u"\u2022": u"-",
+    u"\u2026": u"...",
+    u"\u2264": u"<=",
+    u"\u2265": u">=",
+    u"\u2300": u"\u00d8",
+    u"\u2205": u"\u00d8",
+}
+# Escapes do XML, controles inválidos no XML 1.0 e qualquer caractere fora do ISO-8859-1
+_PADRAO = re.compile(u"[&<>\"'\x00-\x08\x0b\x0c\x0e-\x1f]|[^\x00-\xff]")
+
+
+# FUNCTIONS
+def _latin1_equivalent(char):
+    if char in _SUBSTITUTOS:
+        return _SUBSTITUTOS[char]
+    if unicodedata is not None:
+        base = u"".join(
+            c for c in unicodedata.normalize("NFKD", char)
+            if c <= u"\xff" and not unicodedata.combining(c)
+        )
+        if base:
+            return base
+    return u"?"
+
+
+# CLASSES
+class XmlEscaper(object):
+    """Escapa valores de texto do XML em uma única passada.
+
+    `& < > " '` viram entidades, caracteres de controle são descartados e os
+    caracteres sem representação em ISO-8859-1 são trocados pelo equivalente
+    mais próximo. Substituições e descartes são acumulados e relatados uma
+    única vez no fim da execução.
+    """
+
+    def __init__(self):
+        self.escapes = 0
+        self._avisos = {}
+
+    def escape(self, value, campo="", peca=""):
+        if not value:
+            return ""
+
+        def substituir(match):
+            char = match.group(0)
+            if char in _ESCAPES:
+                self.escapes += 1
+                return _ESCAPES[char]
+            if char < u" ":
+                substituto = u""
+            else:
+                substituto = _latin1_equivalent(char)
+            self._avisos.setdefault((campo, char, substituto), set()).add(peca)
+            return u"".join(_ESCAPES.get(c, c) for c in substituto)
+
+        return _PADRAO.sub(substituir, value)
+
+    def report(self):
+        linhas = []
+        for (campo, char, substituto), pecas in sorted(self._avisos.items()):
+            nomes = sorted(p for p in pecas if p)
+            exemplos = ", ".join(nomes[:5]) + (", ..." if len(nomes) > 5 else "")
+            if substituto:
+                acao = "substituído por '{}'".format(substituto)
+            else:
+                acao = "removido"
+            linhas.append(
+                "O caractere {!r} do campo '{}' foi {} em {} peça(s): {}."
+                .format(char, campo, acao, len(pecas), exemplos)
+            )
+        return linhas
+
+
+class PlannixXmlWriter(object):
+    """Grava cada PECA no arquivo assim que é gerada, sem manter o documento em memória.
+
+    Uso:
+        with PlannixXmlWriter(path, obra, name, projetista) as writer:
+            writer.write(partes_da_peca)
+
+    Se ocorrer um erro dentro do bloco, o arquivo parcial é removido.
+    """
+
+    def __init__(self, path, obra, name, projetista, buffering=65536):
+        self.path = path
+        self.obra = obra
+        self.name = name
+        self.projetista = projetista
+        self.buffering = buffering
+        self.count = 0
+        self._stream = None
+
+    def __enter__(self):
+        self._stream = io.open(
+            self.path,
+            "w",
+            encoding=XML_ENCODING,
+            errors="xmlcharrefreplace",
+            buffering=self.buffering,
+        )
+        self._stream.write(XML_HEADER)
+        self._stream.write(
+            '<DETALHAMENTOPLANNIX obra="' + self.obra + '" name="' + self.name +
+            '" projetista="' + self.projetista + '">\n'
+        )
+        return self
+
+    def write(self, partes):
+        self._stream.writelines(partes)
+        self.count += 1
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self._stream.write("</DETALHAMENTOPLANNIX>")
+        finally:
+            self._stream.close()
+            self._stream = None
+        if exc_type is not None and os.path.exists(self.path):
+            os.remove(self.path)
+        return False